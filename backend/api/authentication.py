@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_CACHE_KEY = "auth_token:{}"
+
+
+def token_cache_key(key):
+    return TOKEN_CACHE_KEY.format(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Кэширует токен вместе с пользователем, чтобы не ходить в БД
+    на каждый запрос. Кэш сбрасывается сигналами из api.signals."""
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(
+                cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+            return user, token
+        return token.user, token
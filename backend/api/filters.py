@@ -19,23 +19,25 @@ class RecipeFilter(filters.FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    ordering = filters.ChoiceFilter(
+        choices=(('trending', 'trending'),), method='filter_ordering'
+    )
 
     def filter_is_favorited(self, queryset, name, value):
         if value and not self.request.user.is_anonymous:
-            marked_recipes = Recipe.marked.favorited_shoppingcart(
-                self.request.user
-            )
-            return marked_recipes.filter(is_favorited=True).all()
+            return queryset.filter(favorite__user=self.request.user)
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         if value and not self.request.user.is_anonymous:
-            marked_recipes = Recipe.marked.favorited_shoppingcart(
-                self.request.user
+            return queryset.filter(
+                shoppingcart__user=self.request.user
             )
-            return marked_recipes.filter(
-                is_in_shopping_cart=True
-            ).all()
+        return queryset
+
+    def filter_ordering(self, queryset, name, value):
+        if value == 'trending':
+            return queryset.order_by('-trending_score', '-pub_date')
         return queryset
 
     class Meta:
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare query latency with fresh and reused DB connections'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--database', default='default')
+
+    def measure(self, connection, iterations, reuse):
+        connection.close()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            if not reuse:
+                connection.close()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        elapsed = time.perf_counter() - started
+        return elapsed / iterations * 1000
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        iterations = options['iterations']
+        fresh = self.measure(connection, iterations, reuse=False)
+        reused = self.measure(connection, iterations, reuse=True)
+        self.stdout.write(
+            f'{connection.vendor}: {iterations} запросов\n'
+            f'новое соединение: {fresh:.3f} мс/запрос\n'
+            f'повторное использование: {reused:.3f} мс/запрос'
+        )
@@ -0,0 +1,43 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Measure API throughput and latency under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--token', default=None)
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+
+        def fetch(_):
+            started = time.perf_counter()
+            response = requests.get(options['url'], headers=headers)
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(
+                pool.map(fetch, range(options['requests']))
+            )
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for _, latency in results)
+        errors = sum(1 for code, _ in results if code >= 500)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f'{len(results)} запросов за {elapsed:.2f} с '
+            f'({len(results) / elapsed:.1f} rps), ошибок 5xx: {errors}\n'
+            f'медиана {statistics.median(latencies):.1f} мс, '
+            f'p95 {p95:.1f} мс'
+        )
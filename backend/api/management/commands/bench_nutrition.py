@@ -0,0 +1,105 @@
+import random
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.nutrition import (
+    NUTRIENTS,
+    calculate_nutrition,
+    get_nutrition,
+    invalidate_all_nutrition,
+)
+from recipes.management.commands._dataset import generate_dataset
+from recipes.models import Ingredient, IngredientNutrition, Recipe
+
+
+class Command(BaseCommand):
+    help = 'Benchmark recipe nutrition calculation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def calculate_python(self, recipe_ids):
+        result = {}
+        for recipe in Recipe.objects.filter(
+            pk__in=recipe_ids
+        ).prefetch_related(
+            'recipeingredientamount__ingredient__nutrition'
+        ):
+            totals = dict.fromkeys(NUTRIENTS, 0.0)
+            complete = True
+            for amount in recipe.recipeingredientamount.all():
+                nutrition = getattr(
+                    amount.ingredient, 'nutrition', None
+                )
+                if nutrition is None:
+                    complete = False
+                    continue
+                for field in NUTRIENTS:
+                    totals[field] += (
+                        float(getattr(nutrition, field))
+                        * amount.amount
+                        / nutrition.per_amount
+                    )
+            result[recipe.pk] = dict(totals, complete=complete)
+        return result
+
+    def measure(self, name, function, recipe_ids, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function(recipe_ids)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        self.stdout.write(
+            f'{name}: {best * 1000:.0f} мс, '
+            f'{len(recipe_ids) / best:.0f} рецептов/с'
+        )
+
+    def handle(self, *args, **options):
+        rnd = random.Random(0)
+        with transaction.atomic():
+            _, recipe_ids = generate_dataset(
+                options['users'], options['recipes']
+            )
+            IngredientNutrition.objects.all().delete()
+            IngredientNutrition.objects.bulk_create(
+                IngredientNutrition(
+                    ingredient_id=ingredient_id,
+                    calories=rnd.uniform(0, 900),
+                    proteins=rnd.uniform(0, 30),
+                    fats=rnd.uniform(0, 100),
+                    carbohydrates=rnd.uniform(0, 100),
+                    price=round(rnd.uniform(10, 1000), 2),
+                )
+                for ingredient_id in Ingredient.objects.values_list(
+                    'id', flat=True
+                )
+            )
+            invalidate_all_nutrition()
+            repeat = options['repeat']
+
+            expected = self.calculate_python(recipe_ids[:100])
+            actual = calculate_nutrition(recipe_ids[:100])
+            same = all(
+                abs(expected[pk][field] - actual[pk][field]) < 0.01
+                for pk in expected
+                for field in NUTRIENTS
+            )
+            self.stdout.write(f'результаты совпадают: {same}')
+
+            self.measure(
+                'Python', self.calculate_python, recipe_ids, repeat
+            )
+            self.measure(
+                'NumPy', calculate_nutrition, recipe_ids, repeat
+            )
+            get_nutrition(recipe_ids)
+            self.measure('Кэш', get_nutrition, recipe_ids, repeat)
+            transaction.set_rollback(True)
+        invalidate_all_nutrition()
+        cache.close()
@@ -0,0 +1,49 @@
+import timeit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.renderers import FastJSONRenderer
+from api.serializers import RecipeSerializer
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON render time of recipe pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[6, 20, 50, 100]
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = AnonymousUser()
+        renderers = (JSONRenderer(), FastJSONRenderer())
+        for size in options['sizes']:
+            recipes = Recipe.objects.all()[:size]
+            data = RecipeSerializer(
+                recipes, many=True, context={'request': request}
+            ).data
+            outputs = [
+                renderer.render(data) for renderer in renderers
+            ]
+            timings = [
+                timeit.timeit(
+                    lambda: renderer.render(data),
+                    number=options['repeat'],
+                )
+                / options['repeat']
+                * 1000
+                for renderer in renderers
+            ]
+            self.stdout.write(
+                f'{len(data)} рецептов, {len(outputs[0])} байт: '
+                f'json {timings[0]:.3f} мс, '
+                f'orjson {timings[1]:.3f} мс, '
+                f'вывод совпадает: {outputs[0] == outputs[1]}'
+            )
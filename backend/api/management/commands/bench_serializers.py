@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import FastRecipeSerializer, RecipeSerializer
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare RecipeSerializer and FastRecipeSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--user', type=int, default=None)
+
+    def serialize(self, serializer_class, request, size):
+        recipes = Recipe.objects.all()[:size]
+        return serializer_class(
+            recipes, many=True, context={'request': request}
+        ).data
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = (
+            User.objects.get(pk=options['user'])
+            if options['user']
+            else AnonymousUser()
+        )
+        renderer = JSONRenderer()
+        expected = renderer.render(
+            self.serialize(RecipeSerializer, request, options['size'])
+        )
+        actual = renderer.render(
+            self.serialize(
+                FastRecipeSerializer, request, options['size']
+            )
+        )
+        self.stdout.write(f'вывод совпадает: {expected == actual}')
+
+        for serializer_class in (
+            RecipeSerializer,
+            FastRecipeSerializer,
+        ):
+            started = time.perf_counter()
+            count = 0
+            for _ in range(options['repeat']):
+                count += len(
+                    self.serialize(
+                        serializer_class, request, options['size']
+                    )
+                )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{serializer_class.__name__}: '
+                f'{count / elapsed:.0f} рецептов/с'
+            )
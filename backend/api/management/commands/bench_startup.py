@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def read_memory(pid):
+    """Rss и Pss процесса в килобайтах из /proc/<pid>/smaps_rollup."""
+    memory = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            name, _, value = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                memory[name] = int(value.split()[0])
+    return memory
+
+
+def get_children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as children:
+        return [int(child) for child in children.read().split()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Start gunicorn with gunicorn.conf.py with and without '
+        'preload_app and compare time to first response and memory'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--path', default='/api/tags/')
+        parser.add_argument('--timeout', type=float, default=60)
+
+    def wait_for(self, check, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if check():
+                return
+            time.sleep(0.02)
+        raise CommandError('gunicorn не ответил за отведенное время')
+
+    def run_server(self, preload, options):
+        url = f'http://127.0.0.1:{options["port"]}{options["path"]}'
+        env = dict(
+            os.environ,
+            GUNICORN_BIND=f'127.0.0.1:{options["port"]}',
+            GUNICORN_PRELOAD=str(preload),
+            GUNICORN_WORKERS=str(options['workers']),
+        )
+
+        def responds():
+            try:
+                return requests.get(url, timeout=5).ok
+            except requests.RequestException:
+                return False
+
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                '-c',
+                'from gunicorn.app.wsgiapp import run; run()',
+                'backend.wsgi:application',
+                '-c',
+                'gunicorn.conf.py',
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_for(responds, options['timeout'])
+            first_response = time.perf_counter() - started
+            self.wait_for(
+                lambda: len(get_children(server.pid))
+                == options['workers'],
+                options['timeout'],
+            )
+            # Каждый воркер должен обработать запросы, иначе без
+            # preload часть из них еще не загрузила приложение.
+            with ThreadPoolExecutor(options['workers'] * 4) as pool:
+                list(
+                    pool.map(
+                        lambda _: requests.get(url),
+                        range(options['workers'] * 50),
+                    )
+                )
+            processes = [server.pid, *get_children(server.pid)]
+            memory = [read_memory(pid) for pid in processes]
+        finally:
+            server.terminate()
+            server.wait()
+        return (
+            first_response,
+            sum(process['Rss'] for process in memory),
+            sum(process['Pss'] for process in memory),
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists('/proc/self/smaps_rollup'):
+            raise CommandError('Нужен Linux с /proc/<pid>/smaps_rollup')
+        self.stdout.write(
+            f'Воркеров: {options["workers"]}, '
+            f'запрос: {options["path"]}'
+        )
+        for preload in (False, True):
+            first_response, rss, pss = self.run_server(
+                preload, options
+            )
+            self.stdout.write(
+                f'preload_app={preload}: первый ответ через '
+                f'{first_response * 1000:.0f} мс, '
+                f'RSS {rss / 1024:.1f} МБ, '
+                f'PSS {pss / 1024:.1f} МБ'
+            )
@@ -0,0 +1,97 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Запуск воркера: настройки, приложения, WSGI и все URL с вьюхами.
+STARTUP_CODE = '''
+import resource, time
+started = time.perf_counter()
+import backend.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(time.perf_counter() - started)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+IMPORT_TIME = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Profile worker startup with python -X importtime and show '
+        'the heaviest modules and packages'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument(
+            '--api-only',
+            action='store_true',
+            help='Profile with API_ONLY=True (no admin/staticfiles)',
+        )
+
+    def run_startup(self, api_only):
+        env = dict(
+            os.environ, DJANGO_SETTINGS_MODULE='backend.settings'
+        )
+        env['API_ONLY'] = str(api_only)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        elapsed, max_rss = result.stdout.split()[-2:]
+        modules = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match:
+                own, cumulative, indent, name = match.groups()
+                modules.append(
+                    (
+                        name,
+                        int(own),
+                        int(cumulative),
+                        len(indent) // 2,
+                    )
+                )
+        return float(elapsed), int(max_rss), modules
+
+    def handle(self, *args, **options):
+        elapsed, max_rss, modules = self.run_startup(
+            options['api_only']
+        )
+        packages = defaultdict(int)
+        for name, own, _, _ in modules:
+            packages[name.split('.')[0]] += own
+        top = options['top']
+
+        self.stdout.write(
+            f'Запуск: {elapsed * 1000:.0f} мс, '
+            f'модулей: {len(modules)}, '
+            f'пиковая память: {max_rss / 1024:.1f} МБ\n'
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING('Пакеты (мс):'))
+        for package, own in sorted(
+            packages.items(), key=lambda item: -item[1]
+        )[:top]:
+            self.stdout.write(f'{own / 1000:8.1f}  {package}')
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                '\nМодули верхнего уровня (мс):'
+            )
+        )
+        for name, _, cumulative, _ in sorted(
+            (module for module in modules if module[3] == 0),
+            key=lambda module: -module[2],
+        )[:top]:
+            self.stdout.write(f'{cumulative / 1000:8.1f}  {name}')
@@ -0,0 +1,95 @@
+import hashlib
+import mimetypes
+import os
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+
+signer = signing.Signer(salt="api.media")
+
+
+def content_hash_name(file):
+    """Имя файла по хэшу содержимого: новая картинка получает новую
+    ссылку, поэтому ответ по старой можно кэшировать бессрочно."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    extension = os.path.splitext(file.name)[1].lower()
+    return f"{digest.hexdigest()[:32]}{extension}"
+
+
+def existing_file_name(model_field, file):
+    """Имя уже сохраненного файла с тем же содержимым. Без этой
+    проверки хранилище сохранило бы копию под именем hash_XXXXXXX.ext."""
+    name = model_field.generate_filename(None, file.name)
+    if model_field.storage.exists(name):
+        return name
+    return None
+
+
+def get_expires():
+    """Срок действия подписи округляется вверх до MEDIA_SIGNED_URL_TTL:
+    ссылка не меняется от запроса к запросу и остается в кэше
+    браузера."""
+    ttl = settings.MEDIA_SIGNED_URL_TTL
+    return (int(time.time()) // ttl + 2) * ttl
+
+
+def get_signature(name, expires):
+    return signer.signature(f"{name}:{expires}")
+
+
+def check_signature(name, expires, signature):
+    return (
+        expires.isdigit()
+        and int(expires) > time.time()
+        and constant_time_compare(
+            signature, get_signature(name, expires)
+        )
+    )
+
+
+def media_url(file):
+    if not file:
+        return None
+    if not settings.MEDIA_SIGNED_URLS:
+        return file.url
+    expires = get_expires()
+    query = urlencode(
+        {
+            "expires": expires,
+            "signature": get_signature(file.name, expires),
+        }
+    )
+    return f"{reverse('media', args=[file.name])}?{query}"
+
+
+def file_response(name, as_attachment=False):
+    """Ответ с файлом из MEDIA_ROOT. С MEDIA_ACCEL_REDIRECT Django
+    только проверяет доступ, а сам файл отдает nginx."""
+    filename = os.path.basename(name)
+    if not settings.MEDIA_ACCEL_REDIRECT:
+        if not default_storage.exists(name):
+            raise Http404
+        return FileResponse(
+            default_storage.open(name, "rb"),
+            as_attachment=as_attachment,
+            filename=filename,
+        )
+    content_type, _ = mimetypes.guess_type(name)
+    response = HttpResponse(
+        content_type=content_type or "application/octet-stream"
+    )
+    location = settings.MEDIA_ACCEL_REDIRECT + quote(name)
+    response["X-Accel-Redirect"] = location
+    if as_attachment:
+        disposition = f'attachment; filename="{filename}"'
+        response["Content-Disposition"] = disposition
+    return response
@@ -0,0 +1,128 @@
+import hashlib
+import re
+from gzip import GzipFile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from .routers import use_replica
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PIN_CACHE_KEY = "replica_pin:{}"
+
+re_accepts_gzip = re.compile(r"\bgzip\b")
+re_accepts_brotli = re.compile(r"\bbr\b")
+
+# Как gzip_types в nginx: PDF, картинки и архивы уже сжаты.
+COMPRESSIBLE_CONTENT_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "application/yaml",
+    "image/svg+xml",
+)
+
+
+def gzip_compress(content, level):
+    buffer = BytesIO()
+    with GzipFile(
+        mode="wb", compresslevel=level, fileobj=buffer, mtime=0
+    ) as gzip_file:
+        gzip_file.write(content)
+    return buffer.getvalue()
+
+
+def pin_cache_key(request):
+    auth = request.META.get("HTTP_AUTHORIZATION")
+    if not auth:
+        return None
+    digest = hashlib.sha1(auth.encode()).hexdigest()
+    return PIN_CACHE_KEY.format(digest)
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica(False)
+
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            key = pin_cache_key(request)
+            if key:
+                cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(
+        self, request, view_func, view_args, view_kwargs
+    ):
+        view_class = getattr(view_func, "cls", None)
+        if (
+            settings.REPLICA_DATABASES
+            and request.method in SAFE_METHODS
+            and getattr(view_class, "read_from_replica", False)
+        ):
+            key = pin_cache_key(request)
+            use_replica(not (key and cache.get(key)))
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "")
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает текстовые ответы больше COMPRESSION_MIN_SIZE байт:
+    brotli, если клиент его принимает и модуль установлен, иначе
+    gzip."""
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or not is_compressible(response)
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+            or response.has_header("Content-Encoding")
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli and re_accepts_brotli.search(accept_encoding):
+            encoding = "br"
+            content = brotli.compress(
+                response.content,
+                quality=settings.COMPRESSION_BROTLI_QUALITY,
+            )
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding = "gzip"
+            content = gzip_compress(
+                response.content, settings.COMPRESSION_GZIP_LEVEL
+            )
+        else:
+            return response
+
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
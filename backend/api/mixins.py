@@ -5,7 +5,48 @@ class ListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     pass
 
 
+class RetrieveViewSet(
+    mixins.RetrieveModelMixin, viewsets.GenericViewSet
+):
+    pass
+
+
 class ListRetrieveViewSet(
-    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
 ):
     pass
+
+
+class SparseFieldsMixin:
+    """Поддержка ?fields=, ?compact= и ?expand= для выдачи.
+
+    ?fields=id,name — только перечисленные поля;
+    ?compact=true — набор полей compact_fields;
+    ?expand=author,text — добавить поля к fields/compact.
+    Выбранные поля передаются сериализатору в контексте ("fields")."""
+
+    sparse_fields = ()
+    compact_fields = ()
+
+    def get_sparse_fields(self):
+        params = self.request.query_params
+        if "fields" in params:
+            requested = set(params["fields"].split(","))
+        elif params.get("compact") in ("1", "true", "True"):
+            requested = set(self.compact_fields)
+        else:
+            return None
+        requested.update(params.get("expand", "").split(","))
+        requested.add("id")
+        return tuple(
+            field
+            for field in self.sparse_fields
+            if field in requested
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
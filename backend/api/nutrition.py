@@ -0,0 +1,148 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import MealPlan, RecipeIngredientAmount
+
+NUTRIENTS = ("calories", "proteins", "fats", "carbohydrates", "price")
+VERSION_KEY = "recipe-nutrition-version"
+
+
+def get_version():
+    return cache.get_or_set(
+        VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None
+    )
+
+
+def nutrition_cache_key(recipe_id, version):
+    return f"recipe-nutrition:{version}:{recipe_id}"
+
+
+def invalidate_nutrition(*recipe_ids):
+    version = get_version()
+    cache.delete_many(
+        [
+            nutrition_cache_key(recipe_id, version)
+            for recipe_id in recipe_ids
+        ]
+    )
+
+
+def invalidate_all_nutrition():
+    """Сбрасывает кэш всех рецептов после изменения таблицы
+    пищевой ценности ингредиентов."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def calculate_nutrition(recipe_ids):
+    """Считает пищевую ценность и стоимость рецептов одним запросом.
+
+    Ингредиенты без данных о пищевой ценности дают NaN, такие
+    рецепты помечаются как неполные ("complete": False)."""
+    import numpy as np
+
+    recipe_ids = np.unique(np.asarray(recipe_ids, dtype=np.int64))
+    rows = RecipeIngredientAmount.objects.filter(
+        recipe_id__in=recipe_ids.tolist()
+    ).values_list(
+        "recipe_id",
+        "amount",
+        "ingredient__nutrition__per_amount",
+        *(f"ingredient__nutrition__{field}" for field in NUTRIENTS),
+    )
+    data = np.array(list(rows), dtype=np.float64).reshape(
+        -1, len(NUTRIENTS) + 3
+    )
+    positions = np.searchsorted(recipe_ids, data[:, 0])
+    values = data[:, 3:] * (data[:, 1] / data[:, 2])[:, np.newaxis]
+    missing = np.isnan(values).any(axis=1)
+
+    totals = np.zeros((len(recipe_ids), len(NUTRIENTS)))
+    np.add.at(totals, positions, np.nan_to_num(values))
+    incomplete = np.bincount(
+        positions, weights=missing, minlength=len(recipe_ids)
+    )
+    totals = totals.round(2).tolist()
+    return {
+        recipe_id: dict(
+            zip(NUTRIENTS, recipe_totals),
+            complete=not recipe_incomplete,
+        )
+        for recipe_id, recipe_totals, recipe_incomplete in zip(
+            recipe_ids.tolist(), totals, incomplete.tolist()
+        )
+    }
+
+
+def get_nutrition(recipe_ids):
+    """Пищевая ценность рецептов с кэшированием по каждому рецепту."""
+    version = get_version()
+    keys = {
+        recipe_id: nutrition_cache_key(recipe_id, version)
+        for recipe_id in recipe_ids
+    }
+    cached = cache.get_many(keys.values())
+    result = {
+        recipe_id: cached[key]
+        for recipe_id, key in keys.items()
+        if key in cached
+    }
+    missed = [
+        recipe_id for recipe_id in keys if recipe_id not in result
+    ]
+    if missed:
+        calculated = calculate_nutrition(missed)
+        cache.set_many(
+            {
+                keys[recipe_id]: value
+                for recipe_id, value in calculated.items()
+            },
+            timeout=settings.NUTRITION_CACHE_TIMEOUT,
+        )
+        result.update(calculated)
+    return result
+
+
+def sum_nutrition(recipe_ids, servings=None):
+    import numpy as np
+
+    nutrition = get_nutrition(recipe_ids)
+    totals = np.array(
+        [
+            [nutrition[recipe_id][field] for field in NUTRIENTS]
+            for recipe_id in recipe_ids
+        ],
+        dtype=np.float64,
+    ).reshape(-1, len(NUTRIENTS))
+    if servings is not None:
+        totals *= np.asarray(servings, dtype=np.float64)[
+            :, np.newaxis
+        ]
+    return dict(
+        zip(NUTRIENTS, totals.sum(axis=0).round(2).tolist()),
+        complete=all(
+            value["complete"] for value in nutrition.values()
+        ),
+    )
+
+
+def get_shopping_cart_nutrition(user):
+    recipe_ids = user.recipes_shoppingcart_related.filter(
+        recipe__deleted_at__isnull=True
+    ).values_list("recipe_id", flat=True)
+    return sum_nutrition(list(recipe_ids))
+
+
+def get_meal_plan_nutrition(user, start, end):
+    plan = list(
+        MealPlan.objects.filter(
+            user=user,
+            date__range=(start, end),
+            recipe__deleted_at__isnull=True,
+        ).values_list("recipe_id", "servings")
+    )
+    return sum_nutrition(
+        [recipe_id for recipe_id, _ in plan],
+        [servings for _, servings in plan],
+    )
@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from recipes.models import Recipe
+
+PREVIEW_FIELDS = ("id", "name", "image", "cooking_time")
+CACHE_SIZE = 10
+
+
+def previews_cache_key(author_id):
+    return f"author-recipes:{author_id}"
+
+
+def invalidate_recipe_previews(*author_ids):
+    keys = [
+        previews_cache_key(author_id) for author_id in set(author_ids)
+    ]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def query_recipe_previews(author_ids, start, end):
+    """Последние рецепты авторов (с start по end, начиная с нуля)
+    одним запросом с нумерацией рецептов каждого автора
+    ROW_NUMBER() OVER (PARTITION BY author_id ORDER BY pub_date DESC)."""
+    ranked = (
+        Recipe.objects.filter(author_id__in=author_ids)
+        .order_by()
+        .annotate(
+            recipe_number=Window(
+                RowNumber(),
+                partition_by=[F("author_id")],
+                order_by=[F("pub_date").desc(), F("id").desc()],
+            )
+        )
+        .values("author_id", "recipe_number", *PREVIEW_FIELDS)
+    )
+    sql, params = ranked.query.sql_with_params()
+    previews = {author_id: [] for author_id in author_ids}
+    with connections[ranked.db].cursor() as cursor:
+        cursor.execute(
+            f"SELECT * FROM ({sql}) ranked "
+            "WHERE recipe_number > %s AND recipe_number <= %s "
+            "ORDER BY recipe_number",
+            [*params, start, end],
+        )
+        columns = [column[0] for column in cursor.description]
+        for row in cursor.fetchall():
+            recipe = dict(zip(columns, row))
+            previews[recipe["author_id"]].append(
+                {field: recipe[field] for field in PREVIEW_FIELDS}
+            )
+    return previews
+
+
+def get_cached_previews(author_ids):
+    keys = {
+        author_id: previews_cache_key(author_id)
+        for author_id in author_ids
+    }
+    cached = cache.get_many(keys.values())
+    previews = {
+        author_id: cached[key]
+        for author_id, key in keys.items()
+        if key in cached
+    }
+    missed = [
+        author_id for author_id in keys if author_id not in previews
+    ]
+    if missed:
+        fetched = query_recipe_previews(missed, 0, CACHE_SIZE)
+        cache.set_many(
+            {
+                keys[author_id]: value
+                for author_id, value in fetched.items()
+            },
+            timeout=settings.RECIPE_PREVIEWS_CACHE_TIMEOUT,
+        )
+        previews.update(fetched)
+    return previews
+
+
+def get_recipe_previews(author_ids, limit, page=1):
+    """Страница последних рецептов каждого автора. Первые CACHE_SIZE
+    рецептов автора кэшируются, если задан
+    RECIPE_PREVIEWS_CACHE_TIMEOUT."""
+    start, end = (page - 1) * limit, page * limit
+    if settings.RECIPE_PREVIEWS_CACHE_TIMEOUT and end <= CACHE_SIZE:
+        previews = {
+            author_id: recipes[start:end]
+            for author_id, recipes in get_cached_previews(
+                author_ids
+            ).items()
+        }
+    else:
+        previews = query_recipe_previews(author_ids, start, end)
+    return {
+        author_id: [Recipe(**recipe) for recipe in recipes]
+        for author_id, recipes in previews.items()
+    }
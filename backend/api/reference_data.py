@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import Ingredient, Tag
+
+from .serializers import IngredientSerializer, TagSerializer
+
+TAGS_CACHE_KEY = "reference:tags"
+INGREDIENTS_CACHE_KEY = "reference:ingredients"
+
+
+def serialize(serializer_class, queryset):
+    return [
+        dict(item)
+        for item in serializer_class(queryset, many=True).data
+    ]
+
+
+def get_tags():
+    """Список тегов целиком: он редко меняется и нужен каждой
+    странице фронтенда."""
+    return cache.get_or_set(
+        TAGS_CACHE_KEY,
+        lambda: serialize(TagSerializer, Tag.objects.all()),
+        timeout=settings.REFERENCE_CACHE_TIMEOUT,
+    )
+
+
+def get_ingredients():
+    return cache.get_or_set(
+        INGREDIENTS_CACHE_KEY,
+        lambda: serialize(
+            IngredientSerializer, Ingredient.objects.all()
+        ),
+        timeout=settings.REFERENCE_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_reference_data():
+    cache.delete_many([TAGS_CACHE_KEY, INGREDIENTS_CACHE_KEY])
+
+
+def warm_reference_data():
+    invalidate_reference_data()
+    get_tags()
+    get_ingredients()
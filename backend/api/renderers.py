@@ -0,0 +1,53 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson с тем же выводом, что и у DRF.
+    Без orjson, а также для форматированного вывода (indent)
+    используется стандартный json."""
+
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson
+        else 0
+    )
+
+    def render(
+        self, data, accepted_media_type=None, renderer_context=None
+    ):
+        if orjson is None or data is None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        indent = self.get_indent(
+            accepted_media_type, renderer_context or {}
+        )
+        if (
+            indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+            PARAGRAPH_SEPARATOR, b'\\u2029'
+        )
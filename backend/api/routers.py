@@ -0,0 +1,33 @@
+import random
+import threading
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+def use_replica(enabled):
+    _state.use_replica = enabled
+
+
+def replica_enabled():
+    return getattr(_state, "use_replica", False)
+
+
+class ReplicaRouter:
+    primary_only_apps = ("authtoken",)
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.REPLICA_DATABASES
+            and replica_enabled()
+            and model._meta.app_label not in self.primary_only_apps
+        ):
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -1,24 +1,33 @@
 import base64
 import imghdr
-import uuid
+import json
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
-from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
+from rest_framework.reverse import reverse
 
+from jobs.models import Job
 from recipes.models import (
     Favorite,
     Ingredient,
+    MealPlan,
     Recipe,
     RecipeIngredientAmount,
+    RecipeRevision,
     ShoppingCart,
     Subscribe,
     Tag,
 )
 
+from .media import content_hash_name, existing_file_name, media_url
+from .nutrition import get_nutrition, invalidate_nutrition
+from .previews import get_recipe_previews
+
 User = get_user_model()
 
 
@@ -103,9 +112,7 @@ class RecipeIngredientAmountWriteSerializer(
 class RecipeSerializer(serializers.ModelSerializer):
 
     author = UserReadSerializer()
-    ingredients = RecipeIngredientAmountSerializer(
-        source="recipeingredientamount", many=True
-    )
+    ingredients = serializers.SerializerMethodField()
     tags = TagSerializer(many=True)
     is_in_shopping_cart = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
@@ -128,9 +135,16 @@ class RecipeSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         response = super().to_representation(instance)
         if instance.image:
-            response["image"] = instance.image.url
+            response["image"] = media_url(instance.image)
         return response
 
+    def get_ingredients(self, obj):
+        # В порядке добавления, как в FastRecipeListSerializer: без
+        # order_by порядок зависит от плана запроса в базе.
+        return RecipeIngredientAmountSerializer(
+            obj.recipeingredientamount.order_by("pk"), many=True
+        ).data
+
     def get_is_favorited(self, obj):
         user = self.context["request"].user
         return (
@@ -150,6 +164,158 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
 
+class FastRecipeListSerializer(serializers.ListSerializer):
+    """Собирает выдачу RecipeSerializer для целой страницы рецептов
+    несколькими запросами через values() вместо запросов на каждый
+    рецепт и без создания вложенных объектов моделей.
+
+    Если в контексте передан список полей ("fields"), то собираются
+    только они, а запросы для остальных связей не выполняются."""
+
+    def to_representation(self, data):
+        recipes = list(data.all() if hasattr(data, "all") else data)
+        recipe_ids = [recipe.pk for recipe in recipes]
+        user = self.context["request"].user
+        fields = (
+            self.context.get("fields") or RecipeSerializer.Meta.fields
+        )
+
+        getters = {
+            "id": lambda recipe: recipe.pk,
+            "name": lambda recipe: recipe.name,
+            "text": lambda recipe: recipe.text,
+            "image": lambda recipe: media_url(recipe.image),
+            "cooking_time": lambda recipe: recipe.cooking_time,
+        }
+        if "author" in fields:
+            authors = self.get_authors(recipes, user)
+            getters["author"] = lambda recipe: authors[
+                recipe.author_id
+            ]
+        if "tags" in fields:
+            tags = self.get_tags(recipe_ids)
+            getters["tags"] = lambda recipe: tags[recipe.pk]
+        if "ingredients" in fields:
+            ingredients = self.get_ingredients(recipe_ids)
+            getters["ingredients"] = lambda recipe: ingredients[
+                recipe.pk
+            ]
+        if "nutrition" in fields:
+            nutrition = get_nutrition(recipe_ids)
+            getters["nutrition"] = lambda recipe: nutrition[recipe.pk]
+        if "is_favorited" in fields:
+            favorited = self.get_marked(Favorite, user, recipe_ids)
+            getters["is_favorited"] = (
+                lambda recipe: recipe.pk in favorited
+            )
+        if "is_in_shopping_cart" in fields:
+            in_shopping_cart = self.get_marked(
+                ShoppingCart, user, recipe_ids
+            )
+            getters["is_in_shopping_cart"] = (
+                lambda recipe: recipe.pk in in_shopping_cart
+            )
+
+        return [
+            {field: getters[field](recipe) for field in fields}
+            for recipe in recipes
+        ]
+
+    def get_authors(self, recipes, user):
+        authors = {
+            author["id"]: author
+            for author in User.objects.filter(
+                pk__in={recipe.author_id for recipe in recipes}
+            ).values(
+                "email", "id", "username", "first_name", "last_name"
+            )
+        }
+        subscribed = set()
+        if user.is_authenticated:
+            subscribed = set(
+                user.follower.filter(
+                    author_id__in=authors.keys()
+                ).values_list("author_id", flat=True)
+            )
+        for author_id, author in authors.items():
+            author["is_subscribed"] = author_id in subscribed
+        return authors
+
+    def get_tags(self, recipe_ids):
+        tags = {recipe_id: [] for recipe_id in recipe_ids}
+        for row in (
+            Recipe.tags.through.objects.filter(
+                recipe_id__in=recipe_ids
+            )
+            .order_by("pk")
+            .values(
+                "recipe_id",
+                "tag__id",
+                "tag__name",
+                "tag__color",
+                "tag__slug",
+            )
+        ):
+            tags[row["recipe_id"]].append(
+                {
+                    "id": row["tag__id"],
+                    "name": row["tag__name"],
+                    "color": row["tag__color"],
+                    "slug": row["tag__slug"],
+                }
+            )
+        return tags
+
+    def get_ingredients(self, recipe_ids):
+        ingredients = {recipe_id: [] for recipe_id in recipe_ids}
+        for row in (
+            RecipeIngredientAmount.objects.filter(
+                recipe_id__in=recipe_ids
+            )
+            .order_by("pk")
+            .values(
+                "recipe_id",
+                "ingredient__id",
+                "ingredient__name",
+                "ingredient__measurement_unit",
+                "amount",
+            )
+        ):
+            ingredients[row["recipe_id"]].append(
+                {
+                    "id": row["ingredient__id"],
+                    "name": row["ingredient__name"],
+                    "measurement_unit": row[
+                        "ingredient__measurement_unit"
+                    ],
+                    "amount": row["amount"],
+                }
+            )
+        return ingredients
+
+    def get_marked(self, model, user, recipe_ids):
+        if not user.is_authenticated:
+            return set()
+        return set(
+            model.objects.filter(
+                user=user, recipe_id__in=recipe_ids
+            ).values_list("recipe_id", flat=True)
+        )
+
+
+class FastRecipeSerializer(serializers.BaseSerializer):
+    """Быстрая версия RecipeSerializer только для чтения."""
+
+    class Meta:
+        list_serializer_class = FastRecipeListSerializer
+
+    def to_representation(self, instance):
+        list_serializer = FastRecipeListSerializer(
+            child=FastRecipeSerializer(), context=self.context
+        )
+        return list_serializer.to_representation([instance])[0]
+
+
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str):
@@ -161,14 +327,19 @@ class Base64ImageField(serializers.ImageField):
             except TypeError:
                 self.fail("invalid_image")
 
-            file_name = str(uuid.uuid4())
+            file_name = "image"
             file_extension = self.get_file_extension(
                 file_name, decoded_file
             )
             fullname = f"{file_name}.{file_extension}"
             data = ContentFile(decoded_file, name=fullname)
 
-        return super().to_internal_value(data)
+        image = super().to_internal_value(data)
+        image.name = content_hash_name(image)
+        model_field = self.parent.Meta.model._meta.get_field(
+            self.source
+        )
+        return existing_file_name(model_field, image) or image
 
     def get_file_extension(self, file_name, decoded_file):
         extension = imghdr.what(file_name, decoded_file)
@@ -200,7 +371,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
-        ingredients = data['ingredients']
+        ingredients = data.get('ingredients', [])
         ingredients_list = []
         for ingredient in ingredients:
             ingredient_id = ingredient['id']
@@ -215,24 +386,26 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
                     {'amount': 'Должен быть хотя-бы один ингредиент'}
                 )
 
-        tags = data['tags']
-        if not tags:
-            raise serializers.ValidationError(
-                {'tags': 'Нужно указать минимум один тег'}
-            )
-        tags_list = []
-        for tag in tags:
-            if tag in tags_list:
+        if 'tags' in data:
+            tags = data['tags']
+            if not tags:
                 raise serializers.ValidationError(
-                    {'tags': 'Теги должны быть уникальны'}
+                    {'tags': 'Нужно указать минимум один тег'}
+                )
+            tags_list = []
+            for tag in tags:
+                if tag in tags_list:
+                    raise serializers.ValidationError(
+                        {'tags': 'Теги должны быть уникальны'}
+                    )
+                tags_list.append(tag)
+
+        if 'cooking_time' in data:
+            cooking_time = data['cooking_time']
+            if int(cooking_time) <= 0:
+                raise serializers.ValidationError(
+                    {'cooking_time': 'Время приготовление больше 0'}
                 )
-            tags_list.append(tag)
-
-        cooking_time = data['cooking_time']
-        if int(cooking_time) <= 0:
-            raise serializers.ValidationError(
-                {'cooking_time': 'Время приготовление больше 0'}
-            )
         return data
 
     def create(self, validated_data):
@@ -251,21 +424,116 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         return recipe
 
     def update(self, instance, validated_data):
-        ing_data = validated_data.pop("ingredients")
-        tags_data = validated_data.pop("tags")
-
-        instance = super().update(instance, validated_data)
-        instance.recipeingredientamount.all().delete()
-        amounts = self.get_amounts(instance, ing_data)
-        RecipeIngredientAmount.objects.bulk_create(amounts)
+        ing_data = validated_data.pop("ingredients", None)
+        tags_data = validated_data.pop("tags", None)
+        validated_data.pop("author", None)
+
+        diff = {}
+        for field, value in validated_data.items():
+            old_value = getattr(instance, field)
+            # Картинка сравнивается по имени: та же картинка получает
+            # то же имя по хэшу содержимого.
+            if old_value == value:
+                continue
+            if field == "image":
+                diff[field] = [old_value.name, None]
+            else:
+                diff[field] = [old_value, value]
+            setattr(instance, field, value)
+        if ing_data is not None:
+            ingredients_diff = self.update_amounts(instance, ing_data)
+            if ingredients_diff:
+                diff["ingredients"] = ingredients_diff
+                transaction.on_commit(
+                    lambda: invalidate_nutrition(instance.pk)
+                )
+        if tags_data is not None:
+            tags_diff = self.update_tags(instance, tags_data)
+            if tags_diff:
+                diff["tags"] = tags_diff
+        if not diff:
+            return instance
+
+        instance.save(
+            update_fields=[
+                field for field in diff if field in validated_data
+            ]
+            + ["updated_at"]
+        )
+        if "image" in diff:
+            diff["image"][1] = instance.image.name
+        RecipeRevision.objects.create(
+            recipe=instance,
+            author=self.context["request"].user,
+            diff=json.dumps(diff, ensure_ascii=False),
+        )
+        return instance
 
-        tags = []
-        for data in tags_data:
-            tag = get_object_or_404(Tag, id=data.id)
-            tags.append(tag)
-        instance.tags.set(tags)
+    def update_amounts(self, recipe, ingredients_data):
+        current = {
+            amount.ingredient_id: amount
+            for amount in recipe.recipeingredientamount.all()
+        }
+        new = {
+            data["id"]: data["amount"] for data in ingredients_data
+        }
+        diff = {}
+
+        removed = current.keys() - new.keys()
+        if removed:
+            RecipeIngredientAmount.objects.filter(
+                pk__in=[
+                    current[ingredient].pk for ingredient in removed
+                ]
+            ).delete()
+            diff["removed"] = {
+                ingredient: current[ingredient].amount
+                for ingredient in removed
+            }
+
+        changed = [
+            current[ingredient]
+            for ingredient in current.keys() & new.keys()
+            if current[ingredient].amount != new[ingredient]
+        ]
+        if changed:
+            diff["changed"] = {
+                amount.ingredient_id: [
+                    amount.amount,
+                    new[amount.ingredient_id],
+                ]
+                for amount in changed
+            }
+            for amount in changed:
+                amount.amount = new[amount.ingredient_id]
+            RecipeIngredientAmount.objects.bulk_update(
+                changed, ["amount"]
+            )
 
-        return instance
+        added = [
+            data
+            for data in ingredients_data
+            if data["id"] not in current
+        ]
+        if added:
+            RecipeIngredientAmount.objects.bulk_create(
+                self.get_amounts(recipe, added)
+            )
+            diff["added"] = {
+                data["id"]: data["amount"] for data in added
+            }
+        return diff
+
+    def update_tags(self, recipe, tags_data):
+        current = set(recipe.tags.values_list("id", flat=True))
+        new = {tag.id for tag in tags_data}
+        if current == new:
+            return {}
+        recipe.tags.set(tags_data)
+        return {
+            "added": sorted(new - current),
+            "removed": sorted(current - new),
+        }
 
     def get_amounts(self, recipe, ingredients_data):
         amounts = [
@@ -281,15 +549,71 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         return amounts
 
     def to_representation(self, instance):
-        return RecipeSerializer(instance, context=self.context).data
+        return FastRecipeSerializer(
+            instance, context=self.context
+        ).data
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
+    image = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
         fields = ("id", "name", "image", "cooking_time")
         read_only_fields = ("id", "name", "image", "cooking_time")
 
+    def get_image(self, obj):
+        return media_url(obj.image)
+
+
+class RecipeIdListSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100,
+    )
+
+    def validate_recipes(self, value):
+        return list(dict.fromkeys(value))
+
+
+class RecipesPreviewSerializer(serializers.Serializer):
+    recipes_limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=settings.REST_FRAMEWORK["PAGE_SIZE"],
+    )
+    recipes_page = serializers.IntegerField(min_value=1, default=1)
+
+
+class SubscriptionListSerializer(serializers.ListSerializer):
+    """Рецепты и число рецептов всех авторов страницы подписок
+    двумя запросами вместо запросов на каждого автора."""
+
+    def to_representation(self, data):
+        subscriptions = list(
+            data.all() if hasattr(data, "all") else data
+        )
+        author_ids = [
+            subscription.author_id for subscription in subscriptions
+        ]
+        if "recipes" in self.child.fields:
+            params = self.child.get_preview_params()
+            self.context["recipes"] = get_recipe_previews(
+                author_ids,
+                params["recipes_limit"],
+                params["recipes_page"],
+            )
+        if "recipes_count" in self.child.fields:
+            self.context["recipes_count"] = dict(
+                Recipe.objects.filter(author_id__in=author_ids)
+                .order_by()
+                .values("author_id")
+                .annotate(count=Count("pk"))
+                .values_list("author_id", "count")
+            )
+        return super().to_representation(subscriptions)
+
 
 class SubscriptionSerializer(serializers.ModelSerializer):
 
@@ -314,6 +638,14 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             "recipes",
             "recipes_count",
         )
+        list_serializer_class = SubscriptionListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields:
+            for field in set(self.fields) - set(fields):
+                self.fields.pop(field)
 
     def get_is_subscribed(self, obj):
         user = self.context["request"].user
@@ -325,19 +657,29 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             ).exists()
         )
 
-    def get_recipes(self, obj):
-        query_params = self.context["request"].query_params
-        limit = query_params.get(
-            "recipes_limit", settings.REST_FRAMEWORK["PAGE_SIZE"]
+    def get_preview_params(self):
+        serializer = RecipesPreviewSerializer(
+            data=self.context["request"].query_params
         )
-        recipes_page = query_params.get("recipes_page", 1)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
 
-        paginator = Paginator(obj.author.recipes.all(), limit)
-        recipes = paginator.page(recipes_page)
+    def get_recipes(self, obj):
+        if "recipes" in self.context:
+            recipes = self.context["recipes"][obj.author_id]
+        else:
+            params = self.get_preview_params()
+            recipes = get_recipe_previews(
+                [obj.author_id],
+                params["recipes_limit"],
+                params["recipes_page"],
+            )[obj.author_id]
         serializer = FavoriteSerializer(recipes, many=True)
         return serializer.data
 
     def get_recipes_count(self, obj):
+        if "recipes_count" in self.context:
+            return self.context["recipes_count"].get(obj.author_id, 0)
         return obj.author.recipes.all().count()
 
 
@@ -363,3 +705,134 @@ class SubscriptionCreateDeleteSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         context = {'request': request}
         return SubscriptionSerializer(instance, context=context).data
+
+
+class JobSerializer(serializers.ModelSerializer):
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ("id", "status", "created", "finished", "download")
+
+    def get_download(self, obj):
+        if obj.status != Job.DONE or not obj.result:
+            return None
+        return reverse(
+            "job-download",
+            args=[obj.pk],
+            request=self.context.get("request"),
+        )
+
+
+class RecipeRevisionSerializer(serializers.ModelSerializer):
+    diff = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecipeRevision
+        fields = ("id", "author", "created", "diff")
+
+    def get_diff(self, obj):
+        return json.loads(obj.diff)
+
+
+MEAL_PLAN_EXISTS = "Рецепт уже запланирован на этот день"
+
+
+def save_meal_plans(save, *args):
+    """Уникальность проверяется в validate, но параллельный запрос мог
+    успеть раньше: нарушение ограничения в БД тоже дает 400."""
+    try:
+        with transaction.atomic():
+            return save(*args)
+    except IntegrityError:
+        raise serializers.ValidationError(
+            {"errors": MEAL_PLAN_EXISTS}
+        )
+
+
+class MealPlanListSerializer(serializers.ListSerializer):
+    def validate(self, data):
+        entries = [(item["date"], item["recipe"].pk) for item in data]
+        if len(set(entries)) != len(entries):
+            raise serializers.ValidationError(
+                {"errors": "Рецепт повторяется в один день"}
+            )
+        # Уже запланированные рецепты проверяются одним запросом на
+        # весь список, а не запросом на каждую запись.
+        planned = MealPlan.objects.filter(
+            user=self.context["request"].user,
+            date__in={date for date, _ in entries},
+            recipe_id__in={recipe_id for _, recipe_id in entries},
+        ).values_list("date", "recipe_id")
+        if set(planned) & set(entries):
+            raise serializers.ValidationError(
+                {"errors": MEAL_PLAN_EXISTS}
+            )
+        return data
+
+    def create(self, validated_data):
+        return save_meal_plans(
+            MealPlan.objects.bulk_create,
+            [MealPlan(**item) for item in validated_data],
+        )
+
+
+class MealPlanSerializer(serializers.ModelSerializer):
+    recipe = serializers.PrimaryKeyRelatedField(
+        queryset=Recipe.objects.all()
+    )
+    user = serializers.HiddenField(
+        default=serializers.CurrentUserDefault()
+    )
+
+    class Meta:
+        model = MealPlan
+        fields = ("id", "date", "recipe", "servings", "user")
+        list_serializer_class = MealPlanListSerializer
+
+    def validate(self, data):
+        if isinstance(self.parent, MealPlanListSerializer):
+            return data
+        plans = MealPlan.objects.filter(
+            user=self.context["request"].user,
+            date=data.get(
+                "date", getattr(self.instance, "date", None)
+            ),
+            recipe=data.get(
+                "recipe", getattr(self.instance, "recipe", None)
+            ),
+        )
+        if self.instance is not None:
+            plans = plans.exclude(pk=self.instance.pk)
+        if plans.exists():
+            raise serializers.ValidationError(
+                {"errors": MEAL_PLAN_EXISTS}
+            )
+        return data
+
+    def create(self, validated_data):
+        return save_meal_plans(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return save_meal_plans(
+            super().update, instance, validated_data
+        )
+
+    def to_representation(self, instance):
+        response = super().to_representation(instance)
+        response["recipe"] = FavoriteSerializer(
+            instance.recipe, context=self.context
+        ).data
+        return response
+
+
+class DateRangeSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, data):
+        if data["start"] > data["end"]:
+            raise serializers.ValidationError(
+                {"end": "Конец периода раньше начала"}
+            )
+        return data
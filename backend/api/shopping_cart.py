@@ -0,0 +1,128 @@
+import io
+import os
+
+from django.conf import settings
+from django.db.models import F, IntegerField, Sum
+
+from recipes.models import MealPlan, RecipeIngredientAmount
+
+from .nutrition import (
+    get_meal_plan_nutrition,
+    get_shopping_cart_nutrition,
+)
+
+FONT_PATH = os.path.join(settings.BASE_DIR, "helvetica.ttf")
+
+
+def get_shopping_cart(user):
+    recipes = user.recipes_shoppingcart_related.filter(
+        recipe__deleted_at__isnull=True
+    ).values_list("recipe__pk", flat=True)
+    return (
+        RecipeIngredientAmount.objects.filter(recipe__in=recipes)
+        .values("ingredient__name", "ingredient__measurement_unit")
+        .annotate(amount=Sum("amount"))
+    )
+
+
+NUTRITION_LABELS = (
+    ("calories", "Калорийность", "ккал"),
+    ("proteins", "Белки", "г"),
+    ("fats", "Жиры", "г"),
+    ("carbohydrates", "Углеводы", "г"),
+    ("price", "Стоимость", "руб."),
+)
+
+
+def get_meal_plan_shopping_list(user, start, end):
+    """Суммирует ингредиенты плана питания за период одним запросом
+    с учетом количества порций."""
+    return (
+        MealPlan.objects.filter(
+            user=user,
+            date__range=(start, end),
+            recipe__deleted_at__isnull=True,
+            recipe__recipeingredientamount__isnull=False,
+        )
+        .values(
+            "recipe__recipeingredientamount__ingredient__name",
+            "recipe__recipeingredientamount__ingredient__measurement_unit",
+        )
+        .annotate(
+            amount=Sum(
+                F("recipe__recipeingredientamount__amount")
+                * F("servings"),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("recipe__recipeingredientamount__ingredient__name")
+    )
+
+
+def shopping_list_pdf(user, start=None, end=None):
+    if start is None:
+        return create_pdf(
+            get_shopping_cart(user), get_shopping_cart_nutrition(user)
+        )
+    return create_pdf(
+        get_meal_plan_shopping_list(user, start, end),
+        get_meal_plan_nutrition(user, start, end),
+    )
+
+
+def register_font():
+    """Регистрирует шрифт один раз на процесс. В gunicorn с
+    preload_app вызывается до fork, и воркеры получают его готовым."""
+    # reportlab нужен только при выгрузке PDF: не грузим его при
+    # старте каждого воркера.
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if "Hel" not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont("Hel", FONT_PATH))
+
+
+def create_pdf(shopping_cart, nutrition=None):
+    from reportlab.pdfgen import canvas
+
+    register_font()
+    buffer = io.BytesIO()
+    page = canvas.Canvas(buffer)
+
+    page.setFont("Hel", 24)
+    x, y = 50, 800
+    page.drawString(x, y + 30, "Список покупок:")
+    for ingredient in shopping_cart:
+        if y < 50:
+            page.showPage()
+            y = 800
+        name, measurement_unit, amount = ingredient.values()
+        page.setFont("Hel", 14)
+        page.drawString(
+            x, y - 10, f"• {name} - {measurement_unit}- {amount}"
+        )
+        y = y - 25
+    if nutrition:
+        if y < 50 + 25 * (len(NUTRITION_LABELS) + 1):
+            page.showPage()
+            y = 800
+        page.setFont("Hel", 18)
+        title = (
+            "Итого:"
+            if nutrition["complete"]
+            else ("Итого (нет данных по части ингредиентов):")
+        )
+        page.drawString(x, y - 10, title)
+        y = y - 35
+        page.setFont("Hel", 14)
+        for field, label, unit in NUTRITION_LABELS:
+            page.drawString(
+                x, y - 10, f"{label}: {nutrition[field]:.2f} {unit}"
+            )
+            y = y - 25
+    page.showPage()
+    page.save()
+    pdf = buffer.getvalue()
+    buffer.close()
+
+    return pdf
@@ -0,0 +1,119 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (
+    Ingredient,
+    IngredientNutrition,
+    Recipe,
+    RecipeIngredientAmount,
+    Subscribe,
+    Tag,
+)
+
+from .authentication import token_cache_key
+from .nutrition import invalidate_all_nutrition, invalidate_nutrition
+from .previews import invalidate_recipe_previews
+from .reference_data import invalidate_reference_data
+from .stats import invalidate_author_stats
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache(sender, instance, **kwargs):
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_token_cache(sender, instance, **kwargs):
+    keys = Token.objects.filter(user_id=instance.pk).values_list(
+        "key", flat=True
+    )
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+# Только post_save: обработчик post_delete заставил бы Django удалять
+# строки ингредиентов по одной. RecipeWriteSerializer и админка
+# сбрасывают кэш после удаления сами.
+@receiver(post_save, sender=RecipeIngredientAmount)
+def invalidate_recipe_nutrition(sender, instance, **kwargs):
+    invalidate_nutrition(instance.recipe_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_author_stats(sender, instance, **kwargs):
+    invalidate_author_stats(instance.author_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_author_recipe_previews(sender, instance, **kwargs):
+    invalidate_recipe_previews(instance.author_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags_author_stats(
+    sender, instance, action, reverse, **kwargs
+):
+    if action.startswith("post_") and not reverse:
+        invalidate_author_stats(instance.author_id)
+
+
+@receiver(post_save, sender=Subscribe)
+@receiver(post_delete, sender=Subscribe)
+def invalidate_subscription_author_stats(sender, instance, **kwargs):
+    invalidate_author_stats(instance.author_id)
+
+
+@receiver(post_save, sender=IngredientNutrition)
+@receiver(post_delete, sender=IngredientNutrition)
+def invalidate_ingredient_nutrition(sender, instance, **kwargs):
+    invalidate_all_nutrition()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_reference_cache(sender, instance, **kwargs):
+    invalidate_reference_data()
+
+
+@receiver(request_started)
+def check_idle_connections(sender, **kwargs):
+    """close_old_connections проверяет соединение, только если в нем
+    были ошибки, поэтому после рестарта БД первый запрос каждого потока
+    падал бы. Проверяются только открытые соединения, простаивавшие
+    дольше DB_CONN_HEALTH_CHECK_IDLE секунд."""
+    idle = settings.DB_CONN_HEALTH_CHECK_IDLE
+    if idle < 0:
+        return
+    now = time.monotonic()
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and now - getattr(connection, "last_used", now) > idle
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+@receiver(request_finished)
+def mark_connections_used(sender, **kwargs):
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.last_used = now
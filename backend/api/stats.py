@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import (
+    Favorite,
+    Recipe,
+    RecipeIngredientAmount,
+    Subscribe,
+)
+
+User = get_user_model()
+
+TOP_SIZE = 5
+
+
+def author_stats_cache_key(author_id):
+    return f"author-stats:{author_id}"
+
+
+def invalidate_author_stats(*author_ids):
+    """Сбрасывает кэш после фиксации транзакции, чтобы параллельный
+    запрос не успел закэшировать данные до изменения."""
+    keys = [
+        author_stats_cache_key(author_id)
+        for author_id in set(author_ids)
+        if author_id is not None
+    ]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_recipes_author_stats(recipe_ids):
+    """Для изменений избранного: автор берется одним запросом на
+    всю операцию, а не сигналом на каждую строку."""
+    invalidate_author_stats(
+        *Recipe.all_objects.filter(pk__in=recipe_ids).values_list(
+            "author_id", flat=True
+        )
+    )
+
+
+def count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def calculate_author_stats(author_id):
+    counts = (
+        User.objects.filter(pk=author_id)
+        .annotate(
+            recipes_count=count_subquery(
+                Recipe.objects.filter(author=OuterRef("pk")), "author"
+            ),
+            followers_count=count_subquery(
+                Subscribe.objects.filter(author=OuterRef("pk")),
+                "author",
+            ),
+            favorites_count=count_subquery(
+                Favorite.objects.filter(
+                    recipe__author=OuterRef("pk"),
+                    recipe__deleted_at__isnull=True,
+                ),
+                "recipe__author",
+            ),
+        )
+        .values("recipes_count", "followers_count", "favorites_count")
+        .first()
+    )
+    if counts is None:
+        return None
+
+    ingredients = (
+        RecipeIngredientAmount.objects.filter(
+            recipe__author=author_id, recipe__deleted_at__isnull=True
+        )
+        .values(
+            "ingredient__id",
+            "ingredient__name",
+            "ingredient__measurement_unit",
+        )
+        .annotate(recipes_count=Count("pk"))
+        .order_by("-recipes_count", "ingredient__name")[:TOP_SIZE]
+    )
+    tags = (
+        Recipe.tags.through.objects.filter(
+            recipe__author=author_id, recipe__deleted_at__isnull=True
+        )
+        .values("tag__id", "tag__name", "tag__color", "tag__slug")
+        .annotate(recipes_count=Count("pk"))
+        .order_by("-recipes_count", "tag__name")[:TOP_SIZE]
+    )
+    return dict(
+        counts,
+        top_ingredients=[
+            {
+                "id": row["ingredient__id"],
+                "name": row["ingredient__name"],
+                "measurement_unit": row[
+                    "ingredient__measurement_unit"
+                ],
+                "recipes_count": row["recipes_count"],
+            }
+            for row in ingredients
+        ],
+        top_tags=[
+            {
+                "id": row["tag__id"],
+                "name": row["tag__name"],
+                "color": row["tag__color"],
+                "slug": row["tag__slug"],
+                "recipes_count": row["recipes_count"],
+            }
+            for row in tags
+        ],
+    )
+
+
+def get_author_stats(author_id):
+    key = author_stats_cache_key(author_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = calculate_author_stats(author_id)
+        if stats is not None:
+            cache.set(
+                key,
+                stats,
+                timeout=settings.AUTHOR_STATS_CACHE_TIMEOUT,
+            )
+    return stats
@@ -0,0 +1,13 @@
+from django.core.files.base import ContentFile
+
+from jobs.registry import task
+
+from .shopping_cart import shopping_list_pdf
+
+
+@task
+def shopping_cart_pdf(job, start=None, end=None):
+    pdf = shopping_list_pdf(job.user, start, end)
+    job.result.save(
+        f"list_{job.pk}.pdf", ContentFile(pdf), save=False
+    )
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from api.authentication import CachedTokenAuthentication
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user",
+            email="user@example.com",
+            password="password",
+            first_name="Имя",
+            last_name="Фамилия",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self):
+        return self.authentication.authenticate_credentials(
+            self.token.key
+        )
+
+    def test_cached_token_needs_no_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate()[0], self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate()[0], self.user)
+
+    def test_deleted_token(self):
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+User = get_user_model()
+
+THREADS = 8
+
+
+@skipIf(
+    connection.vendor == "sqlite",
+    "SQLite блокирует на запись всю базу",
+)
+class ConcurrentToggleTest(TransactionTestCase):
+    """Одновременные запросы одного пользователя к одному рецепту:
+    запись создается или удаляется ровно один раз, остальные
+    запросы получают 400."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user",
+            email="user@example.com",
+            password="password",
+            first_name="Имя",
+            last_name="Фамилия",
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            name="Рецепт",
+            text="Описание",
+            cooking_time=10,
+            image="recipes/images/image.jpeg",
+        )
+
+    def request_concurrently(self, method, url):
+        barrier = Barrier(THREADS)
+
+        def request(_):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                return getattr(client, method)(url).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            return sorted(pool.map(request, range(THREADS)))
+
+    def check_toggle(self, model, action):
+        url = f"/api/recipes/{self.recipe.pk}/{action}/"
+        rows = model.objects.filter(
+            user=self.user, recipe=self.recipe
+        )
+
+        self.assertEqual(
+            self.request_concurrently("post", url),
+            [201] + [400] * (THREADS - 1),
+        )
+        self.assertEqual(rows.count(), 1)
+
+        self.assertEqual(
+            self.request_concurrently("delete", url),
+            [204] + [400] * (THREADS - 1),
+        )
+        self.assertEqual(rows.count(), 0)
+
+    def test_favorite(self):
+        self.check_toggle(Favorite, "favorite")
+
+    def test_shopping_cart(self):
+        self.check_toggle(ShoppingCart, "shopping_cart")
+
+
+class BulkToggleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user",
+            email="user@example.com",
+            password="password",
+            first_name="Имя",
+            last_name="Фамилия",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_too_many_recipes(self):
+        for action in ("bulk_favorite", "bulk_shopping_cart"):
+            for method in ("post", "delete"):
+                with self.subTest(action=action, method=method):
+                    response = getattr(self.client, method)(
+                        f"/api/recipes/{action}/",
+                        {"recipes": list(range(1, 102))},
+                        format="json",
+                    )
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("recipes", response.data)
+
+    def test_max_recipes(self):
+        recipe = Recipe.objects.create(
+            author=self.user,
+            name="Рецепт",
+            text="Описание",
+            cooking_time=10,
+            image="recipes/images/image.jpeg",
+        )
+        response = self.client.post(
+            "/api/recipes/bulk_favorite/",
+            {"recipes": [recipe.pk] + list(range(1000, 1099))},
+            format="json",
+        )
+        self.assertLess(response.status_code, 300)
+        self.assertTrue(
+            Favorite.objects.filter(
+                user=self.user, recipe=recipe
+            ).exists()
+        )
@@ -0,0 +1,258 @@
+import json
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import FastRecipeSerializer, RecipeSerializer
+from api.views import RecipeViewSet
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredientAmount,
+    ShoppingCart,
+    Subscribe,
+    Tag,
+)
+
+User = get_user_model()
+
+SEED = 20261019
+USERS = 3
+RECIPES = 15
+FIELDS = RecipeSerializer.Meta.fields
+# Все наборы полей, которые можно запросить через ?fields=: "id"
+# добавляется всегда, порядок полей как в RecipeSerializer.
+FIELD_SUBSETS = [
+    ("id",)
+    + tuple(
+        field
+        for bit, field in enumerate(FIELDS[1:])
+        if mask >> bit & 1
+    )
+    for mask in range(2 ** (len(FIELDS) - 1))
+]
+
+
+class FastRecipeSerializerTest(TestCase):
+    """FastRecipeSerializer должен отдавать то же, что и
+    RecipeSerializer, для любых рецептов, пользователя, страницы и
+    набора полей. Данные генерируются случайно с фиксированным seed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(SEED)
+        cls.users = [
+            User.objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                password="password",
+                first_name="Имя",
+                last_name="Фамилия",
+            )
+            for index in range(USERS)
+        ]
+        tags = [
+            Tag.objects.create(
+                name=f"Тег {index}",
+                color=f"#00000{index}",
+                slug=f"tag{index}",
+            )
+            for index in rng.sample(range(5), 5)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f"Ингредиент {index}",
+                measurement_unit=rng.choice(("г", "шт", "мл")),
+            )
+            for index in range(8)
+        ]
+        for index in range(RECIPES):
+            recipe = Recipe.objects.create(
+                author=rng.choice(cls.users),
+                name=f"Рецепт {index}",
+                text=rng.choice(("Описание", "")),
+                cooking_time=rng.randint(1, 120),
+                image=rng.choice(("recipes/images/image.jpeg", "")),
+            )
+            recipe.tags.set(rng.sample(tags, rng.randint(0, 3)))
+            RecipeIngredientAmount.objects.bulk_create(
+                RecipeIngredientAmount(
+                    recipe=recipe,
+                    ingredient=ingredient,
+                    amount=rng.randint(1, 500),
+                )
+                for ingredient in rng.sample(
+                    ingredients, rng.randint(0, 4)
+                )
+            )
+            for user in cls.users:
+                for model in (Favorite, ShoppingCart):
+                    if rng.random() < 0.4:
+                        model.objects.create(user=user, recipe=recipe)
+        for user in cls.users:
+            for author in rng.sample(
+                cls.users, rng.randint(0, USERS)
+            ):
+                if author != user:
+                    Subscribe.objects.create(user=user, author=author)
+
+    def setUp(self):
+        self.rng = random.Random(SEED)
+
+    def get_context(self, user, fields=None):
+        request = Request(APIRequestFactory().get("/api/recipes/"))
+        request.user = user
+        return {"request": request, "fields": fields}
+
+    def serialize(
+        self, serializer_class, user, fields=None, **kwargs
+    ):
+        data = serializer_class(
+            context=self.get_context(user, fields), **kwargs
+        ).data
+        return json.loads(json.dumps(data))
+
+    def get_expected(self, user):
+        recipes = Recipe.objects.order_by("pk")
+        return {
+            recipe["id"]: recipe
+            for recipe in self.serialize(
+                RecipeSerializer, user, instance=recipes, many=True
+            )
+        }
+
+    def get_page(self, fields, size):
+        # Как RecipeViewSet.get_queryset: столбцы вне fields
+        # не загружаются.
+        recipe_ids = self.rng.sample(
+            list(Recipe.objects.values_list("pk", flat=True)), size
+        )
+        return list(
+            Recipe.objects.filter(pk__in=recipe_ids).only(
+                "id",
+                *(
+                    field
+                    for field in fields
+                    if field in RecipeViewSet.recipe_columns
+                ),
+            )
+        )
+
+    def check_equal(self, user, expected, fields, page):
+        recipes = self.serialize(
+            FastRecipeSerializer,
+            user,
+            fields,
+            instance=page,
+            many=True,
+        )
+        expected_recipes = [
+            {field: expected[recipe.pk][field] for field in fields}
+            for recipe in page
+        ]
+        self.assertEqual(recipes, expected_recipes)
+        self.assertEqual(
+            [list(recipe) for recipe in recipes],
+            [list(recipe) for recipe in expected_recipes],
+        )
+
+    def test_random_pages(self):
+        for user in [AnonymousUser(), *self.users]:
+            expected = self.get_expected(user)
+            for fields in FIELD_SUBSETS:
+                page = self.get_page(
+                    fields, self.rng.randint(0, RECIPES)
+                )
+                with self.subTest(user=user, fields=fields):
+                    self.check_equal(user, expected, fields, page)
+
+    def test_all_fields(self):
+        for user in [AnonymousUser(), *self.users]:
+            with self.subTest(user=user):
+                self.check_equal(
+                    user,
+                    self.get_expected(user),
+                    FIELDS,
+                    list(Recipe.objects.all()),
+                )
+                self.assertEqual(
+                    self.serialize(
+                        FastRecipeSerializer,
+                        user,
+                        instance=Recipe.objects.all(),
+                        many=True,
+                    ),
+                    self.serialize(
+                        RecipeSerializer,
+                        user,
+                        instance=Recipe.objects.all(),
+                        many=True,
+                    ),
+                )
+
+    def test_single_recipe(self):
+        user = self.users[0]
+        expected = self.get_expected(user)
+        for fields in FIELD_SUBSETS:
+            recipe = self.get_page(fields, 1)[0]
+            with self.subTest(fields=fields, recipe=recipe.pk):
+                self.assertEqual(
+                    self.serialize(
+                        FastRecipeSerializer,
+                        user,
+                        fields,
+                        instance=recipe,
+                    ),
+                    {
+                        field: expected[recipe.pk][field]
+                        for field in fields
+                    },
+                )
+
+    def test_empty_page(self):
+        for user in (AnonymousUser(), self.users[0]):
+            for instance in ([], Recipe.objects.none()):
+                with self.subTest(user=user, instance=instance):
+                    self.assertEqual(
+                        self.serialize(
+                            FastRecipeSerializer,
+                            user,
+                            instance=instance,
+                            many=True,
+                        ),
+                        [],
+                    )
+
+    def test_generated_data(self):
+        """Случайные данные покрывают крайние случаи, иначе остальные
+        тесты их не проверяют."""
+        recipes = Recipe.objects.all()
+        self.assertTrue(recipes.filter(tags=None).exists())
+        self.assertTrue(
+            recipes.filter(recipeingredientamount=None).exists()
+        )
+        self.assertTrue(recipes.filter(image="").exists())
+        self.assertTrue(Favorite.objects.exists())
+        self.assertTrue(ShoppingCart.objects.exists())
+        self.assertTrue(Subscribe.objects.exists())
+
+    def test_anonymous_has_no_marks(self):
+        recipes = self.serialize(
+            FastRecipeSerializer,
+            AnonymousUser(),
+            instance=Recipe.objects.all(),
+            many=True,
+        )
+        self.assertFalse(
+            any(
+                recipe["is_favorited"]
+                or recipe["is_in_shopping_cart"]
+                or recipe["author"]["is_subscribed"]
+                for recipe in recipes
+            )
+        )
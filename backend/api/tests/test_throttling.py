@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from api.throttling import ActionRateThrottle
+
+THREADS = 16
+NOW = 1000.0
+
+
+class ActionRateThrottleTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(
+            ActionRateThrottle, "THROTTLE_RATES", {"favorite": "10/m"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request = SimpleNamespace(
+            user=SimpleNamespace(is_authenticated=True, pk=1)
+        )
+        self.view = SimpleNamespace(
+            action="favorite",
+            throttle_scopes={"favorite": "favorite"},
+        )
+
+    def allow(self, now=NOW):
+        throttle = ActionRateThrottle()
+        throttle.timer = lambda: now
+        return throttle.allow_request(self.request, self.view)
+
+    def test_concurrent_requests(self):
+        barrier = Barrier(THREADS)
+
+        def request(_):
+            barrier.wait()
+            return [self.allow() for _ in range(5)]
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            results = sum(pool.map(request, range(THREADS)), [])
+        self.assertEqual(results.count(True), 10)
+
+    def test_refill(self):
+        self.assertEqual(
+            [self.allow() for _ in range(11)].count(True), 10
+        )
+        self.assertFalse(self.allow(NOW + 5))
+        self.assertTrue(self.allow(NOW + 6))
+        self.assertFalse(self.allow(NOW + 6))
+
+    def test_evicted_start_does_not_lock_out(self):
+        for _ in range(11):
+            self.allow()
+        cache.delete("throttle_favorite_1_start")
+        self.assertTrue(self.allow(NOW + 1))
+
+    def test_evicted_count(self):
+        for _ in range(10):
+            self.allow()
+        cache.delete("throttle_favorite_1_count")
+        self.assertTrue(self.allow())
+        throttle = ActionRateThrottle()
+        throttle.duration = 60
+        cache.delete("throttle_favorite_1_count")
+        self.assertEqual(
+            throttle.change_count("throttle_favorite_1_count", -1), 0
+        )
+
+    def test_unknown_scope(self):
+        self.view.action = "list"
+        throttle = ActionRateThrottle()
+        self.assertTrue(
+            throttle.allow_request(self.request, self.view)
+        )
+        self.assertIsNone(throttle.rate)
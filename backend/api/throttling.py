@@ -0,0 +1,98 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketRateThrottle(SimpleRateThrottle):
+    """Token bucket поверх атомарного счетчика в кэше.
+
+    В кэше хранятся момент создания корзины и число израсходованных
+    токенов (cache.incr). К моменту now доступно
+    num_requests + (now - start) * num_requests / duration токенов;
+    излишек сверх емкости корзины сгорает, чтобы после простоя нельзя
+    было сделать больше num_requests запросов подряд."""
+
+    cache_format = "throttle_%(scope)s_%(ident)s"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        start_key, count_key = (
+            f"{self.key}_start",
+            f"{self.key}_count",
+        )
+        # Ключи могут быть вытеснены из кэша по отдельности. Новая
+        # корзина начинается со сброшенного счетчика, иначе старый
+        # счетчик при новом start заблокировал бы клиента.
+        if self.cache.add(start_key, now, self.duration):
+            self.cache.set(count_key, 0, self.duration)
+        start = self.cache.get(start_key, now)
+        count = self.change_count(count_key, 1)
+        self.cache.touch(start_key, self.duration)
+        self.cache.touch(count_key, self.duration)
+
+        refill = (now - start) * self.num_requests / self.duration
+        available = self.num_requests + refill - count
+        if available < 0:
+            self.change_count(count_key, -1)
+            self.wait_time = (
+                -available * self.duration / self.num_requests
+            )
+            return False
+
+        overflow = int(available - (self.num_requests - 1))
+        if overflow > 0:
+            self.change_count(count_key, overflow)
+        return True
+
+    def change_count(self, count_key, delta):
+        """Атомарно меняет счетчик. Если ключ успели вытеснить из
+        кэша, счетчик начинается заново."""
+        try:
+            return self.cache.incr(count_key, delta)
+        except ValueError:
+            count = max(delta, 0)
+            self.cache.add(count_key, count, self.duration)
+            return count
+
+    def wait(self):
+        return getattr(self, "wait_time", None)
+
+
+class ActionRateThrottle(TokenBucketRateThrottle):
+    """Лимит на действие вьюсета: view.throttle_scopes сопоставляет
+    action с ключом DEFAULT_THROTTLE_RATES. Авторизованные
+    пользователи различаются по id, анонимные — по IP."""
+
+    def __init__(self):
+        # scope зависит от action вьюсета, поэтому лимит определяется
+        # в allow_request, а не при создании, как в SimpleRateThrottle.
+        self.scope = None
+        self.rate = None
+        self.num_requests = self.duration = None
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scopes", {}).get(
+            view.action
+        )
+        if (
+            self.scope is None
+            or self.scope not in self.THROTTLE_RATES
+        ):
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": ident,
+        }
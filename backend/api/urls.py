@@ -3,10 +3,13 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     IngredientViewSet,
+    JobViewSet,
+    MealPlanViewSet,
     RecipeViewSet,
     SubscriptionViewSet,
     TagViewSet,
     UserViewSet,
+    media,
 )
 
 router = DefaultRouter()
@@ -21,8 +24,11 @@ router.register(
     r"ingredients", IngredientViewSet, basename="ingredient"
 )
 router.register(r"users", UserViewSet, basename="user")
+router.register(r"jobs", JobViewSet, basename="job")
+router.register(r"meal-plans", MealPlanViewSet, basename="meal-plan")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("auth/", include("djoser.urls.authtoken")),
+    path("media/<path:name>", media, name="media"),
 ]
@@ -1,37 +1,84 @@
-import io
+import time
+from datetime import date, timedelta
 
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet as DjoserUserViewSet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from recipes.models import Ingredient, Recipe, RecipeIngredientAmount, Tag
+from jobs.models import Job
+from recipes.models import Favorite, Ingredient, Recipe, Tag
 
 from .filters import IngredientFilter, RecipeFilter
-from .mixins import ListRetrieveViewSet, ListViewSet
+from .media import check_signature, file_response
+from .mixins import (
+    ListRetrieveViewSet,
+    ListViewSet,
+    RetrieveViewSet,
+    SparseFieldsMixin,
+)
 from .permissions import IsOwner, ReadOnly
+from .reference_data import get_ingredients, get_tags
 from .serializers import (
+    DateRangeSerializer,
+    FastRecipeSerializer,
     FavoriteSerializer,
     IngredientSerializer,
+    JobSerializer,
+    MealPlanSerializer,
+    RecipeIdListSerializer,
+    RecipeRevisionSerializer,
+    RecipesPreviewSerializer,
     RecipeSerializer,
     RecipeWriteSerializer,
     SubscriptionCreateDeleteSerializer,
     SubscriptionSerializer,
     TagSerializer,
 )
+from .shopping_cart import (
+    get_meal_plan_shopping_list,
+    get_shopping_cart,
+    shopping_list_pdf,
+)
+from .stats import (
+    get_author_stats,
+    invalidate_author_stats,
+    invalidate_recipes_author_stats,
+)
+from .tasks import shopping_cart_pdf
+from .throttling import ActionRateThrottle
 
 User = get_user_model()
 
 
+def shopping_list_response(request, shopping_list, **period):
+    """PDF со списком покупок или фоновая задача для длинных списков."""
+    if shopping_list.count() > settings.SHOPPING_CART_ASYNC_THRESHOLD:
+        job = shopping_cart_pdf.delay(user=request.user, **period)
+        serializer = JobSerializer(job, context={"request": request})
+        return Response(
+            serializer.data, status=status.HTTP_202_ACCEPTED
+        )
+
+    pdf = shopping_list_pdf(request.user, **period)
+    response = HttpResponse(pdf, content_type="application/pdf")
+    content_disposition = 'attachment; filename="list.pdf"'
+    response["Content-Disposition"] = content_disposition
+    return response
+
+
 class UserViewSet(DjoserUserViewSet):
+    throttle_classes = (ActionRateThrottle,)
+    throttle_scopes = {"subscribe": "subscribe"}
+
     @action(
         methods=["post", "delete"],
         detail=True,
@@ -41,6 +88,11 @@ class UserViewSet(DjoserUserViewSet):
         user = request.user
 
         if request.method == "POST":
+            # Параметры превью рецептов проверяются до создания
+            # подписки, а не при выдаче ответа.
+            RecipesPreviewSerializer(
+                data=request.query_params
+            ).is_valid(raise_exception=True)
             data = {'user': request.user.id, 'author': id}
             serializer = SubscriptionCreateDeleteSerializer(
                 data=data, context={'request': request}
@@ -60,14 +112,58 @@ class UserViewSet(DjoserUserViewSet):
                 response, status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(
+        methods=["get"],
+        detail=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+    def stats(self, request, id=None):
+        stats = get_author_stats(int(id)) if id.isdigit() else None
+        if stats is None:
+            return Response(
+                {"detail": "Страница не найдена."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(stats)
+
 
-class SubscriptionViewSet(ListViewSet):
+class SubscriptionViewSet(SparseFieldsMixin, ListViewSet):
     serializer_class = SubscriptionSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    read_from_replica = True
+    sparse_fields = SubscriptionSerializer.Meta.fields
+    compact_fields = (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "is_subscribed",
+        "recipes_count",
+    )
+    author_columns = (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "email",
+    )
 
     def get_queryset(self):
         user = self.request.user
-        return user.follower.all()
+        queryset = user.follower.select_related("author")
+        fields = self.get_sparse_fields()
+        if fields:
+            queryset = queryset.only(
+                "id",
+                "user_id",
+                "author__id",
+                *(
+                    f"author__{field}"
+                    for field in fields
+                    if field in self.author_columns
+                ),
+            )
+        return queryset
 
 
 class IngredientViewSet(ListRetrieveViewSet):
@@ -77,6 +173,19 @@ class IngredientViewSet(ListRetrieveViewSet):
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     pagination_class = None
+    read_from_replica = True
+
+    def list(self, request, *args, **kwargs):
+        if set(request.query_params) - {"name"}:
+            return super().list(request, *args, **kwargs)
+        name = request.query_params.get("name", "")
+        return Response(
+            [
+                ingredient
+                for ingredient in get_ingredients()
+                if ingredient["name"].startswith(name)
+            ]
+        )
 
 
 class TagViewSet(ListRetrieveViewSet):
@@ -84,24 +193,83 @@ class TagViewSet(ListRetrieveViewSet):
     serializer_class = TagSerializer
     permission_classes = (permissions.AllowAny,)
     pagination_class = None
+    read_from_replica = True
+
+    def list(self, request, *args, **kwargs):
+        return Response(get_tags())
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = (
         (permissions.IsAuthenticated & IsOwner) | ReadOnly,
     )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    read_from_replica = True
+    sparse_fields = RecipeSerializer.Meta.fields + ("nutrition",)
+    compact_fields = (
+        "id",
+        "name",
+        "author",
+        "tags",
+        "is_favorited",
+        "is_in_shopping_cart",
+        "image",
+        "cooking_time",
+    )
+    recipe_columns = (
+        "name",
+        "author",
+        "text",
+        "image",
+        "cooking_time",
+    )
+    throttle_classes = (ActionRateThrottle,)
+    throttle_scopes = {
+        "create": "create",
+        "favorite": "favorite",
+        "bulk_favorite": "favorite",
+        "shopping_cart": "shopping_cart",
+        "bulk_shopping_cart": "shopping_cart",
+        "download_shopping_cart": "download_shopping_cart",
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields and self.request.method in permissions.SAFE_METHODS:
+            queryset = queryset.only(
+                "id",
+                *(
+                    field
+                    for field in fields
+                    if field in self.recipe_columns
+                ),
+            )
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "retrieve" and context["fields"] is None:
+            context["fields"] = self.sparse_fields
+        return context
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
-            return RecipeSerializer
+            return FastRecipeSerializer
         return RecipeWriteSerializer
 
-    def partial_update(self, request, *args, **kwargs):
-        kwargs["partial"] = False
-        return self.update(request, *args, **kwargs)
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+    @action(methods=["get"], detail=True)
+    def revisions(self, request, pk=None):
+        recipe = self.get_object()
+        queryset = recipe.revisions.all()
+        page = self.paginate_queryset(queryset)
+        serializer = RecipeRevisionSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def favorite_shopping_cart(
         self, request, pk, model, related, text
@@ -109,37 +277,37 @@ class RecipeViewSet(viewsets.ModelViewSet):
         user = request.user
         model = apps.get_model(app_label="recipes", model_name=model)
 
-        try:
-            recipe = Recipe.objects.get(pk=pk)
-        except Recipe.DoesNotExist:
-            response = {"errors": "Рецепт не найден."}
-            return Response(
-                response, status=status.HTTP_400_BAD_REQUEST
-            )
-
         if request.method == "POST":
-            item, is_created = model.objects.get_or_create(
-                user=user, recipe=recipe
-            )
-            if is_created:
-                serializer = FavoriteSerializer(recipe)
+            try:
+                recipe = Recipe.objects.get(pk=pk)
+            except Recipe.DoesNotExist:
+                response = {"errors": "Рецепт не найден."}
                 return Response(
-                    serializer.data, status=status.HTTP_201_CREATED
+                    response, status=status.HTTP_400_BAD_REQUEST
                 )
-            response = {"errors": f"Рецепт уже в {text}."}
+            try:
+                with transaction.atomic():
+                    model.objects.create(user=user, recipe=recipe)
+            except IntegrityError:
+                response = {"errors": f"Рецепт уже в {text}."}
+                return Response(
+                    response, status=status.HTTP_400_BAD_REQUEST
+                )
+            if model is Favorite:
+                invalidate_author_stats(recipe.author_id)
+            serializer = FavoriteSerializer(recipe)
             return Response(
-                response, status=status.HTTP_400_BAD_REQUEST
+                serializer.data, status=status.HTTP_201_CREATED
             )
 
-        try:
-            item = related.get(recipe_id=pk)
-        except model.DoesNotExist:
+        deleted, _ = related.filter(recipe_id=pk).delete()
+        if not deleted:
             response = {"errors": f"Рецепт не найден в {text}."}
             return Response(
                 response, status=status.HTTP_400_BAD_REQUEST
             )
-
-        item.delete()
+        if model is Favorite:
+            invalidate_recipes_author_stats([pk])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -172,27 +340,102 @@ class RecipeViewSet(viewsets.ModelViewSet):
             text="список покупок",
         )
 
-    def create_pdf(self, shopping_cart):
-        buffer = io.BytesIO()
-        page = canvas.Canvas(buffer)
-
-        pdfmetrics.registerFont(TTFont("Hel", "helvetica.ttf"))
-        page.setFont("Hel", 24)
-        x, y = 50, 800
-        page.drawString(x, y + 30, "Список покупок:")
-        for ingredient in shopping_cart:
-            name, measurement_unit, amount = ingredient.values()
-            page.setFont("Hel", 14)
-            page.drawString(
-                x, y - 10, f"• {name} - {measurement_unit}- {amount}"
+    def bulk_favorite_shopping_cart(self, request, model, related):
+        model = apps.get_model(app_label="recipes", model_name=model)
+        serializer = RecipeIdListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["recipes"]
+
+        if request.method == "POST":
+            existing = dict(
+                Recipe.objects.filter(pk__in=ids).values_list(
+                    "pk", "author_id"
+                )
+            )
+            marked = set(
+                related.filter(
+                    recipe_id__in=existing.keys()
+                ).values_list("recipe_id", flat=True)
+            )
+            model.objects.bulk_create(
+                (
+                    model(user=request.user, recipe_id=recipe_id)
+                    for recipe_id in existing.keys() - marked
+                ),
+                ignore_conflicts=True,
+            )
+            if model is Favorite:
+                invalidate_author_stats(
+                    *(
+                        existing[recipe_id]
+                        for recipe_id in existing.keys() - marked
+                    )
+                )
+            results = []
+            for recipe_id in ids:
+                if recipe_id not in existing:
+                    result = "not_found"
+                elif recipe_id in marked:
+                    result = "exists"
+                else:
+                    result = "added"
+                results.append({"id": recipe_id, "status": result})
+            return Response(
+                {"results": results}, status=status.HTTP_200_OK
             )
-            y = y - 25
-        page.showPage()
-        page.save()
-        pdf = buffer.getvalue()
-        buffer.close()
 
-        return pdf
+        items = related.filter(recipe_id__in=ids)
+        marked = dict(
+            items.values_list("recipe_id", "recipe__author_id")
+        )
+        items.delete()
+        if model is Favorite:
+            invalidate_author_stats(*marked.values())
+        results = [
+            {
+                "id": recipe_id,
+                "status": "removed"
+                if recipe_id in marked
+                else "not_found",
+            }
+            for recipe_id in ids
+        ]
+        return Response(
+            {"results": results}, status=status.HTTP_200_OK
+        )
+
+    @action(
+        methods=["post", "delete"],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def bulk_favorite(self, request):
+        return self.bulk_favorite_shopping_cart(
+            request=request,
+            model="Favorite",
+            related=request.user.recipes_favorite_related,
+        )
+
+    @action(
+        methods=["post", "delete"],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def bulk_shopping_cart(self, request):
+        return self.bulk_favorite_shopping_cart(
+            request=request,
+            model="ShoppingCart",
+            related=request.user.recipes_shoppingcart_related,
+        )
+
+    @action(
+        methods=["delete"],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+    )
+    def clear_shopping_cart(self, request):
+        request.user.recipes_shoppingcart_related.all().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         methods=["get"],
@@ -200,20 +443,92 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,),
     )
     def download_shopping_cart(self, request):
-        user = request.user
-        recipes = user.recipes_shoppingcart_related.all().values_list(
-            "recipe__pk", flat=True
+        return shopping_list_response(
+            request, get_shopping_cart(request.user)
         )
-        shopping_cart = (
-            RecipeIngredientAmount.objects.filter(recipe__in=recipes)
-            .values(
-                "ingredient__name", "ingredient__measurement_unit"
+
+
+class MealPlanViewSet(viewsets.ModelViewSet):
+    serializer_class = MealPlanSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    throttle_classes = (ActionRateThrottle,)
+    throttle_scopes = {"shopping_list": "download_shopping_cart"}
+
+    def get_queryset(self):
+        queryset = self.request.user.meal_plans.filter(
+            recipe__deleted_at__isnull=True
+        ).select_related("recipe")
+        params = self.request.query_params
+        if "start" in params or "end" in params:
+            period = self.get_period()
+            queryset = queryset.filter(
+                date__range=(period["start"], period["end"])
             )
-            .annotate(amount=Sum("amount"))
+        return queryset
+
+    def get_period(self):
+        """Период из ?start=&end=, по умолчанию текущая неделя."""
+        today = date.today()
+        monday = today - timedelta(days=today.weekday())
+        params = self.request.query_params
+        serializer = DateRangeSerializer(
+            data={
+                "start": params.get("start", monday),
+                "end": params.get("end", monday + timedelta(days=6)),
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_serializer(self, *args, **kwargs):
+        if isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
+    @action(methods=["get"], detail=False)
+    def shopping_list(self, request):
+        period = {
+            key: value.isoformat()
+            for key, value in self.get_period().items()
+        }
+        return shopping_list_response(
+            request,
+            get_meal_plan_shopping_list(request.user, **period),
+            **period,
         )
 
-        pdf = self.create_pdf(shopping_cart)
-        response = HttpResponse(pdf, content_type="application/pdf")
-        content_disposition = 'attachment; filename="list.pdf"'
-        response["Content-Disposition"] = content_disposition
-        return response
+
+class JobViewSet(RetrieveViewSet):
+    serializer_class = JobSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.request.user.jobs.all()
+
+    @action(methods=["get"], detail=True)
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != Job.DONE or not job.result:
+            response = {"errors": "Результат задачи еще не готов."}
+            return Response(
+                response, status=status.HTTP_400_BAD_REQUEST
+            )
+        return file_response(job.result.name, as_attachment=True)
+
+
+@require_safe
+def media(request, name):
+    """Файл по подписанной ссылке из media_url."""
+    expires = request.GET.get("expires", "")
+    if not check_signature(
+        name, expires, request.GET.get("signature", "")
+    ):
+        return HttpResponseForbidden()
+    response = file_response(name)
+    patch_cache_control(
+        response,
+        private=True,
+        immutable=True,
+        max_age=int(expires) - int(time.time()),
+    )
+    return response
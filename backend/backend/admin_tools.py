@@ -0,0 +1,77 @@
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 100_000
+
+
+def where_sql(query, connection):
+    return query.where.as_sql(
+        query.get_compiler(connection=connection), connection
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Берёт число строк нефильтрованной таблицы из статистики PostgreSQL.
+
+    Точный COUNT(*) по миллионам строк выполняется секундами, а для
+    навигации по страницам админки хватает оценки планировщика.
+    Фильтр менеджера по умолчанию (например, скрытие мягко удаленных
+    рецептов) не считается фильтром: оценка включает и эти строки.
+    """
+
+    def is_unfiltered(self, queryset, connection):
+        if not queryset.query.where:
+            return True
+        default = queryset.model._default_manager.all()
+        try:
+            return where_sql(queryset.query, connection) == where_sql(
+                default.query, connection
+            )
+        except EmptyResultSet:
+            return False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and self.is_unfiltered(
+            queryset, connection
+        ):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATE_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class PrefixSearchAdminMixin:
+    """Ищет по началу строки, чтобы PostgreSQL мог использовать индекс.
+
+    Стандартный поиск админки строит UPPER(...) LIKE '%...%', который
+    всегда читает таблицу целиком.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        conditions = (
+            Q(**{f"{field}__startswith": search_term})
+            for field in self.get_search_fields(request)
+        )
+        return queryset.filter(reduce(or_, conditions)), False
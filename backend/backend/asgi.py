@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ASGI_THREADS', default=16)),
+    thread_name_prefix='asgi',
+)
+
+
+def closing_application(wsgi_application):
+    # Django шлет request_finished (и закрывает соединения с БД)
+    # только в response.close(), который WsgiToAsgi не вызывает.
+    # Тело отдается по частям: run_wsgi_app перебирает их в потоке
+    # пула и сразу отправляет клиенту, не собирая ответ в памяти.
+    def application(environ, start_response):
+        response = wsgi_application(environ, start_response)
+        try:
+            yield from response
+        finally:
+            response.close()
+
+    return application
+
+
+class ThreadPoolWsgiToAsgiInstance(WsgiToAsgiInstance):
+    # Исходный run_wsgi_app выполняется в одном общем потоке
+    # (thread_sensitive), здесь запросы расходятся по пулу потоков.
+    run_wsgi_app = sync_to_async(
+        WsgiToAsgiInstance.__dict__['run_wsgi_app'].func,
+        thread_sensitive=False,
+        executor=executor,
+    )
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        instance = ThreadPoolWsgiToAsgiInstance(self.wsgi_application)
+        await instance(scope, receive, send)
+
+
+application = ThreadPoolWsgiToAsgi(
+    closing_application(get_wsgi_application())
+)
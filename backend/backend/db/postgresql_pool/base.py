@@ -0,0 +1,106 @@
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    """Пул, в котором getconn() ждет освободившееся соединение до
+    timeout секунд, а не сразу падает с PoolError, когда потоков
+    больше, чем MAX_SIZE."""
+
+    def __init__(self, minconn, maxconn, timeout, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise pool.PoolError(
+                f"no free connection in the pool after {self.timeout} s"
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        self.slots.release()
+
+
+def close_pools():
+    """Закрывает соединения всех пулов процесса. Вызывается в мастере
+    gunicorn перед fork: иначе воркеры унаследуют его открытые сокеты
+    и будут работать через одни и те же соединения."""
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+        _pools.clear()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend, который берет соединения из пула процесса
+    вместо открытия нового соединения на каждый запрос."""
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                options = self.settings_dict.get("POOL_OPTIONS", {})
+                _pools[self.alias] = BlockingConnectionPool(
+                    options.get("MIN_SIZE", 1),
+                    options.get("MAX_SIZE", 10),
+                    options.get("TIMEOUT", 10),
+                    **conn_params,
+                )
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool(conn_params)
+        connection = connection_pool.getconn()
+        if not self.is_healthy(connection):
+            connection_pool.putconn(connection, close=True)
+            connection = connection_pool.getconn()
+
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(
+                    isolation_level=self.isolation_level
+                )
+        return connection
+
+    def is_healthy(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # SELECT вне autocommit открывает транзакцию, а Django
+            # после получения соединения включает autocommit, что
+            # внутри транзакции невозможно.
+            connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection_pool = _pools[self.alias]
+        try:
+            # Сбрасывает незавершенную транзакцию и настройки сессии,
+            # чтобы следующий запрос получил чистое соединение.
+            self.connection.reset()
+        except base.Database.Error:
+            connection_pool.putconn(self.connection, close=True)
+        else:
+            connection_pool.putconn(self.connection)
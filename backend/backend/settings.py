@@ -7,7 +7,7 @@ load_dotenv()
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = os.getenv('SECRET_KEY', default='p&l%385148kslhtyn^##a1)ilz@4zqj=rq&agdol^##zgl9(vs)')
-DEBUG = True
+DEBUG = os.getenv("DEBUG", default="False") == "True"
 
 ALLOWED_HOSTS = ['*']
 
@@ -25,16 +25,19 @@ INSTALLED_APPS = [
     "django_filters",
     "api.apps.ApiConfig",
     "recipes.apps.RecipesConfig",
+    "jobs.apps.JobsConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "backend.urls"
@@ -55,6 +58,25 @@ TEMPLATES = [
     },
 ]
 
+# API_ONLY=True запускает воркер без админки и статики: меньше
+# импортов при старте и памяти на процесс.
+API_ONLY = os.getenv("API_ONLY", default="False") == "True"
+if API_ONLY:
+    INSTALLED_APPS = [
+        app
+        for app in INSTALLED_APPS
+        if app
+        not in (
+            "django.contrib.admin",
+            "django.contrib.messages",
+            "django.contrib.staticfiles",
+        )
+    ]
+    MIDDLEWARE.remove("django.contrib.messages.middleware.MessageMiddleware")
+    TEMPLATES[0]["OPTIONS"]["context_processors"].remove(
+        "django.contrib.messages.context_processors.messages"
+    )
+
 WSGI_APPLICATION = "backend.wsgi.application"
 
 
@@ -70,9 +92,73 @@ DATABASES = {
         ),
         "HOST": os.getenv("DB_HOST", default="db"),
         "PORT": os.getenv("DB_PORT", default=5432),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", default=60)),
+        "POOL_OPTIONS": {
+            "MIN_SIZE": int(os.getenv("DB_POOL_MIN_SIZE", default=1)),
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", default=10)),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", default=10)),
+        },
     }
 }
 
+# Постоянное соединение, простаивавшее дольше этого числа секунд,
+# проверяется перед запросом (после рестарта или переключения БД
+# оно уже закрыто сервером). -1 отключает проверку.
+DB_CONN_HEALTH_CHECK_IDLE = float(
+    os.getenv("DB_CONN_HEALTH_CHECK_IDLE", default=10)
+)
+
+DB_REPLICAS = [
+    replica
+    for replica in os.getenv("DB_REPLICAS", default="").split(",")
+    if replica
+]
+REPLICA_DATABASES = []
+for index, replica in enumerate(DB_REPLICAS):
+    alias = f"replica_{index}"
+    location = "HOST"
+    if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+        location = "NAME"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        location: replica,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["api.routers.ReplicaRouter"]
+
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", default=5))
+
+
+# Токены, статистика авторов и справочники сбрасываются в кэше при
+# изменениях, поэтому кэш должен быть общим для всех воркеров
+# gunicorn и сервиса worker. LocMemCache живет в одном процессе и
+# годится только для разработки.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache"
+            if DEBUG
+            else "django.core.cache.backends.memcached.MemcachedCache",
+        ),
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", default="" if DEBUG else "memcached:11211"
+        ),
+    }
+}
+
+AUTH_TOKEN_CACHE_TIMEOUT = int(
+    os.getenv("AUTH_TOKEN_CACHE_TIMEOUT", default=60)
+)
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", default=1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", default=6))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.getenv("COMPRESSION_BROTLI_QUALITY", default=5)
+)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -99,8 +185,17 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -108,6 +203,17 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "api.pagination.LimitPageNumberPagination",
     "PAGE_SIZE": 6,
+    "DEFAULT_THROTTLE_RATES": {
+        "create": os.getenv("THROTTLE_RATE_CREATE", default="20/h"),
+        "download_shopping_cart": os.getenv(
+            "THROTTLE_RATE_DOWNLOAD", default="10/m"
+        ),
+        "favorite": os.getenv("THROTTLE_RATE_FAVORITE", default="60/m"),
+        "shopping_cart": os.getenv(
+            "THROTTLE_RATE_SHOPPING_CART", default="60/m"
+        ),
+        "subscribe": os.getenv("THROTTLE_RATE_SUBSCRIBE", default="30/m"),
+    },
 }
 
 
@@ -142,3 +248,38 @@ STATIC_ROOT = os.path.join(BASE_DIR, "djangostatic")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Подписанные ссылки на картинки /api/media/...?expires=&signature=
+MEDIA_SIGNED_URLS = (
+    os.getenv("MEDIA_SIGNED_URLS", default="False") == "True"
+)
+MEDIA_SIGNED_URL_TTL = int(
+    os.getenv("MEDIA_SIGNED_URL_TTL", default=60 * 60 * 24)
+)
+# Префикс internal location в nginx: Django проверяет доступ к файлу
+# и отвечает заголовком X-Accel-Redirect, а файл отдает nginx.
+# Пустая строка — файл отдает Django (разработка без nginx).
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", default="")
+
+SHOPPING_CART_ASYNC_THRESHOLD = int(
+    os.getenv("SHOPPING_CART_ASYNC_THRESHOLD", default=200)
+)
+TRENDING_HALF_LIFE_HOURS = float(
+    os.getenv("TRENDING_HALF_LIFE_HOURS", default=72)
+)
+TRENDING_LAG_SECONDS = int(os.getenv("TRENDING_LAG_SECONDS", default=300))
+RECIPE_PURGE_AFTER_DAYS = int(
+    os.getenv("RECIPE_PURGE_AFTER_DAYS", default=30)
+)
+# 0 отключает кэш последних рецептов авторов в подписках.
+RECIPE_PREVIEWS_CACHE_TIMEOUT = int(
+    os.getenv("RECIPE_PREVIEWS_CACHE_TIMEOUT", default=60 * 10)
+)
+AUTHOR_STATS_CACHE_TIMEOUT = int(
+    os.getenv("AUTHOR_STATS_CACHE_TIMEOUT", default=60 * 10)
+)
+REFERENCE_CACHE_TIMEOUT = int(
+    os.getenv("REFERENCE_CACHE_TIMEOUT", default=60 * 60)
+)
+NUTRITION_CACHE_TIMEOUT = int(
+    os.getenv("NUTRITION_CACHE_TIMEOUT", default=60 * 60 * 24)
+)
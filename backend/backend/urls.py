@@ -1,7 +1,11 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import include, path
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
 ]
+
+if not settings.API_ONLY:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
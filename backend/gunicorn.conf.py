@@ -0,0 +1,61 @@
+"""Настройки gunicorn: gunicorn backend.wsgi:application -c gunicorn.conf.py
+
+Приложение загружается и прогревается в мастер-процессе до fork,
+поэтому воркеры получают импортированные модули, кэши справочников
+и шрифт для PDF готовыми и делят эти страницы памяти (copy-on-write).
+"""
+import gc
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", default="0:8000")
+preload_app = os.getenv("GUNICORN_PRELOAD", default="True") == "True"
+workers = int(
+    os.getenv("GUNICORN_WORKERS", default=min(2 * cpu_count + 1, 12))
+)
+threads = int(os.getenv("GUNICORN_THREADS", default=2))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", default=30))
+# Перезапуск воркеров ограничивает рост памяти, разброс не дает
+# всем воркерам перезапуститься одновременно.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", default=1000))
+max_requests_jitter = int(
+    os.getenv(
+        "GUNICORN_MAX_REQUESTS_JITTER", default=max_requests // 10
+    )
+)
+# Heartbeat воркеров в памяти, а не на диске контейнера.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from django.core.cache import caches
+    from django.db import DatabaseError, connections
+
+    from api.reference_data import warm_reference_data
+    from api.shopping_cart import register_font
+    from backend.db.postgresql_pool.base import close_pools
+
+    # БД может быть еще не готова или без миграций (первый запуск):
+    # без прогрева воркеры заполнят кэш при первых запросах.
+    try:
+        warm_reference_data()
+    except DatabaseError as error:
+        server.log.warning("Reference data not warmed up: %s", error)
+    register_font()
+    # Соединения мастера не должны достаться воркерам после fork.
+    # С пулом close_all() только возвращает соединение в пул, поэтому
+    # пулы закрываются отдельно.
+    connections.close_all()
+    close_pools()
+    for cache in caches.all():
+        cache.close()
+    # Сборщик мусора не трогает объекты мастера, и их страницы
+    # остаются общими с воркерами.
+    gc.collect()
+    gc.freeze()
+    server.log.info("Application warmed up before fork")
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "user",
+        "attempts",
+        "created",
+        "started",
+        "finished",
+    )
+    list_filter = ("status", "name")
+    raw_id_fields = ("user",)
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,138 @@
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from jobs import registry
+from jobs.models import Job
+
+EXPIRE_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true')
+        parser.add_argument('--sleep', type=float, default=1.0)
+        parser.add_argument('--max-attempts', type=int, default=3)
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=600,
+            help=(
+                'Seconds after which a running job is considered '
+                'lost (its runner died) and is retried or failed'
+            ),
+        )
+        parser.add_argument(
+            '--keep-results',
+            type=float,
+            default=86400,
+            help=(
+                'Seconds after which finished jobs are deleted '
+                'together with their result files'
+            ),
+        )
+
+    def requeue_stale(self, stale_after, max_attempts):
+        """Возвращает в очередь задачи, которые слишком долго в статусе
+        RUNNING: их обработчик завершился, не сохранив результат.
+        Задачи, исчерпавшие попытки, помечаются как FAILED."""
+        now = timezone.now()
+        stale = Job.objects.filter(
+            status=Job.RUNNING,
+            started__lt=now - timedelta(seconds=stale_after),
+        )
+        error = 'Обработчик не завершил задачу за отведенное время'
+        requeued = stale.filter(attempts__lt=max_attempts).update(
+            status=Job.PENDING, run_after=now, error=error
+        )
+        failed = stale.update(
+            status=Job.FAILED, finished=now, error=error
+        )
+        if requeued or failed:
+            self.stderr.write(
+                f'Зависшие задачи: {requeued} в очереди, '
+                f'{failed} с ошибкой'
+            )
+
+    def expire_finished(self, keep_results):
+        """Удаляет давно завершенные задачи и файлы их результатов.
+        Файлы удаляются после строк: ссылка на удаленный файл из
+        API не выдается."""
+        expired = list(
+            Job.objects.filter(
+                status__in=(Job.DONE, Job.FAILED),
+                finished__lt=timezone.now()
+                - timedelta(seconds=keep_results),
+            ).values_list('pk', 'result')[:EXPIRE_BATCH_SIZE]
+        )
+        if not expired:
+            return
+        Job.objects.filter(pk__in=[pk for pk, _ in expired]).delete()
+        storage = Job._meta.get_field('result').storage
+        for _, name in expired:
+            if name:
+                storage.delete(name)
+        self.stderr.write(
+            f'Удалено завершенных задач: {len(expired)}'
+        )
+
+    def claim(self):
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=Job.PENDING, run_after__lte=timezone.now()
+                )
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.started = timezone.now()
+            job.save(update_fields=['status', 'attempts', 'started'])
+        return job
+
+    def run_job(self, job, max_attempts):
+        try:
+            registry.run(job)
+        except Exception:
+            job.error = traceback.format_exc()
+            if job.attempts < max_attempts:
+                job.status = Job.PENDING
+                job.run_after = timezone.now() + timedelta(
+                    seconds=2**job.attempts
+                )
+            else:
+                job.status = Job.FAILED
+                job.finished = timezone.now()
+            self.stderr.write(f'{job}: {job.error}')
+        else:
+            job.status = Job.DONE
+            job.finished = timezone.now()
+        job.save()
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            self.requeue_stale(
+                options['stale_after'], options['max_attempts']
+            )
+            self.expire_finished(options['keep_results'])
+            job = self.claim()
+            if job is not None:
+                started = time.perf_counter()
+                self.run_job(job, options['max_attempts'])
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'{job} за {elapsed:.2f} с')
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['sleep'])
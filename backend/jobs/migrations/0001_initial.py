@@ -0,0 +1,43 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Задача')),
+                ('payload', models.TextField(default='{}', verbose_name='Параметры')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('result', models.FileField(blank=True, upload_to='jobs/', verbose_name='Результат')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Запустить после')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ('-created',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils import timezone
+
+User = get_user_model()
+
+
+class Job(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Готово"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField(max_length=200, verbose_name="Задача")
+    payload = models.TextField(default="{}", verbose_name="Параметры")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Статус",
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        verbose_name="Пользователь",
+    )
+    result = models.FileField(
+        upload_to="jobs/", blank=True, verbose_name="Результат"
+    )
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Попыток"
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now, verbose_name="Запустить после"
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name="Создана"
+    )
+    started = models.DateTimeField(
+        null=True, blank=True, verbose_name="Запущена"
+    )
+    finished = models.DateTimeField(
+        null=True, blank=True, verbose_name="Завершена"
+    )
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="job_queue_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} {self.status}"
@@ -0,0 +1,31 @@
+import json
+
+from .models import Job
+
+tasks = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу.
+
+    Функция получает объект Job первым аргументом и параметры из
+    payload именованными аргументами. Поставить в очередь:
+    func.delay(user=user, **payload)."""
+    name = f"{func.__module__}.{func.__name__}"
+    tasks[name] = func
+
+    def delay(user=None, **payload):
+        return enqueue(name, user=user, **payload)
+
+    func.delay = delay
+    return func
+
+
+def enqueue(name, user=None, **payload):
+    return Job.objects.create(
+        name=name, user=user, payload=json.dumps(payload)
+    )
+
+
+def run(job):
+    tasks[job.name](job, **json.loads(job.payload))
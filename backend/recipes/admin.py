@@ -1,34 +1,100 @@
 from django.contrib import admin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.nutrition import invalidate_nutrition
+from backend.admin_tools import (
+    LargeTableAdminMixin,
+    PrefixSearchAdminMixin,
+)
 
 from .models import (
+    ArchivedRecipe,
     Favorite,
     Ingredient,
+    IngredientNutrition,
+    MealPlan,
     Recipe,
     RecipeIngredientAmount,
+    RecipeRevision,
     ShoppingCart,
     Subscribe,
     Tag,
 )
 
 
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(
+    LargeTableAdminMixin, PrefixSearchAdminMixin, admin.ModelAdmin
+):
     model = Recipe
     readonly_fields = ("added_to_favorites",)
     list_display = (
         "name",
         "author",
+        "added_to_favorites",
     )
     list_display_links = ("name",)
-    list_filter = ("author", "name")
-
-
-class IngredientAdmin(admin.ModelAdmin):
+    list_filter = ("tags",)
+    list_select_related = ("author",)
+    search_fields = ("name",)
+    autocomplete_fields = ("author", "tags")
+
+    def get_queryset(self, request):
+        favorites = (
+            Favorite.objects.filter(recipe=OuterRef("pk"))
+            .order_by()
+            .values("recipe")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                favorites_count=Coalesce(
+                    Subquery(favorites, output_field=IntegerField()),
+                    0,
+                )
+            )
+        )
+
+    def added_to_favorites(self, obj):
+        return obj.favorites_count
+
+    added_to_favorites.short_description = "В избранном"
+
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+
+    def delete_queryset(self, request, queryset):
+        for recipe in queryset:
+            recipe.soft_delete()
+
+
+class IngredientAdmin(PrefixSearchAdminMixin, admin.ModelAdmin):
     list_display = (
         "name",
         "measurement_unit",
     )
     list_display_links = ("name",)
-    list_filter = ("name",)
+    search_fields = ("name",)
+
+
+class IngredientNutritionAdmin(
+    PrefixSearchAdminMixin, admin.ModelAdmin
+):
+    list_display = (
+        "ingredient",
+        "per_amount",
+        "calories",
+        "proteins",
+        "fats",
+        "carbohydrates",
+        "price",
+    )
+    list_select_related = ("ingredient",)
+    search_fields = ("ingredient__name",)
+    autocomplete_fields = ("ingredient",)
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -37,26 +103,38 @@ class TagAdmin(admin.ModelAdmin):
         "slug",
     )
     list_display_links = ("name",)
+    search_fields = ("name",)
 
 
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(
+    LargeTableAdminMixin, PrefixSearchAdminMixin, admin.ModelAdmin
+):
     list_display = (
         "id",
         "user",
         "author",
     )
+    list_select_related = ("user", "author")
+    search_fields = ("user__username", "author__username")
+    autocomplete_fields = ("user", "author")
 
 
-class ShoppingCartAdmin(admin.ModelAdmin):
+class ShoppingCartAdmin(
+    LargeTableAdminMixin, PrefixSearchAdminMixin, admin.ModelAdmin
+):
     list_display = (
         "id",
         "user",
         "recipe",
     )
-    list_filter = ("user",)
+    list_select_related = ("user", "recipe")
+    search_fields = ("user__username",)
+    autocomplete_fields = ("user", "recipe")
 
 
-class RecipeIngredientAmountAdmin(admin.ModelAdmin):
+class RecipeIngredientAmountAdmin(
+    LargeTableAdminMixin, PrefixSearchAdminMixin, admin.ModelAdmin
+):
     list_display = (
         "id",
         "recipe",
@@ -67,22 +145,77 @@ class RecipeIngredientAmountAdmin(admin.ModelAdmin):
         "id",
         "ingredient",
     )
-    list_filter = ("recipe",)
+    list_select_related = ("recipe", "ingredient")
+    search_fields = ("recipe__name",)
+    autocomplete_fields = ("recipe", "ingredient")
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_nutrition(obj.recipe_id)
 
+    def delete_queryset(self, request, queryset):
+        recipe_ids = set(queryset.values_list("recipe_id", flat=True))
+        super().delete_queryset(request, queryset)
+        invalidate_nutrition(*recipe_ids)
 
-class FavoriteAdmin(admin.ModelAdmin):
+
+class FavoriteAdmin(
+    LargeTableAdminMixin, PrefixSearchAdminMixin, admin.ModelAdmin
+):
     list_display = (
         "id",
         "user",
         "recipe",
     )
-    list_filter = ("user",)
+    list_select_related = ("user", "recipe")
+    search_fields = ("user__username",)
+    autocomplete_fields = ("user", "recipe")
+
+
+class RecipeRevisionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "id",
+        "recipe",
+        "author",
+        "created",
+    )
+    list_select_related = ("recipe", "author")
+    raw_id_fields = ("recipe", "author")
+
+
+class MealPlanAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "date",
+        "recipe",
+        "servings",
+    )
+    list_select_related = ("user", "recipe")
+    autocomplete_fields = ("user", "recipe")
+
+
+class ArchivedRecipeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "original_id",
+        "name",
+        "author",
+        "deleted_at",
+        "archived_at",
+    )
+    list_display_links = ("original_id", "name")
+    list_select_related = ("author",)
+    raw_id_fields = ("author",)
 
 
 admin.site.register(Tag, TagAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
+admin.site.register(IngredientNutrition, IngredientNutritionAdmin)
 admin.site.register(RecipeIngredientAmount, RecipeIngredientAmountAdmin)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(Subscribe, SubscriptionAdmin)
 admin.site.register(Favorite, FavoriteAdmin)
 admin.site.register(ShoppingCart, ShoppingCartAdmin)
+admin.site.register(RecipeRevision, RecipeRevisionAdmin)
+admin.site.register(MealPlan, MealPlanAdmin)
+admin.site.register(ArchivedRecipe, ArchivedRecipeAdmin)
@@ -0,0 +1,135 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredientAmount,
+    ShoppingCart,
+    Subscribe,
+    Tag,
+)
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+
+
+def generate_dataset(
+    users, recipes, ingredients_per_recipe=8, seed=0
+):
+    """Заполняет базу синтетическими данными для бенчмарков."""
+    # Django 2.2 не ограничивает batch_size лимитами SQLite.
+    batch_size = BATCH_SIZE if connection.vendor != "sqlite" else None
+    rnd = random.Random(seed)
+    prefix = f"bench{rnd.randrange(10 ** 8)}"
+
+    if not Ingredient.objects.exists():
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f"ингредиент {i}", measurement_unit="г")
+            for i in range(2000)
+        )
+    if not Tag.objects.exists():
+        Tag.objects.bulk_create(
+            Tag(name=name, color=color, slug=slug)
+            for name, color, slug in (
+                ("Завтрак", "#E26C2D", "breakfast"),
+                ("Обед", "#49B64E", "lunch"),
+                ("Ужин", "#8775D2", "dinner"),
+            )
+        )
+    ingredient_ids = list(
+        Ingredient.objects.values_list("id", flat=True)
+    )
+    tag_ids = list(Tag.objects.values_list("id", flat=True))
+
+    User.objects.bulk_create(
+        (
+            User(
+                username=f"{prefix}_{i}",
+                email=f"{prefix}_{i}@example.com",
+                first_name="Имя",
+                last_name="Фамилия",
+            )
+            for i in range(users)
+        ),
+        batch_size=batch_size,
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith=prefix).values_list(
+            "id", flat=True
+        )
+    )
+
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author_id=rnd.choice(user_ids),
+                name=f"{prefix} рецепт {i}",
+                image="recipes/images/images.jpeg",
+                text="Описание рецепта. " * 20,
+                cooking_time=rnd.randint(5, 120),
+            )
+            for i in range(recipes)
+        ),
+        batch_size=batch_size,
+    )
+    recipe_ids = list(
+        Recipe.objects.filter(name__startswith=prefix).values_list(
+            "id", flat=True
+        )
+    )
+
+    RecipeIngredientAmount.objects.bulk_create(
+        (
+            RecipeIngredientAmount(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=rnd.randint(1, 500),
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in rnd.sample(
+                ingredient_ids,
+                min(ingredients_per_recipe, len(ingredient_ids)),
+            )
+        ),
+        batch_size=batch_size,
+    )
+    Recipe.tags.through.objects.bulk_create(
+        (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rnd.sample(
+                tag_ids, rnd.randint(1, len(tag_ids))
+            )
+        ),
+        batch_size=batch_size,
+    )
+    for model in (Favorite, ShoppingCart):
+        model.objects.bulk_create(
+            (
+                model(user_id=user_id, recipe_id=recipe_id)
+                for user_id in user_ids
+                for recipe_id in set(
+                    rnd.sample(recipe_ids, min(10, len(recipe_ids)))
+                )
+            ),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+    Subscribe.objects.bulk_create(
+        (
+            Subscribe(user_id=user_id, author_id=author_id)
+            for user_id in user_ids
+            for author_id in set(
+                rnd.sample(user_ids, min(5, len(user_ids)))
+            )
+            if author_id != user_id
+        ),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    return user_ids, recipe_ids
@@ -0,0 +1,11 @@
+import gzip
+import sys
+
+
+def open_jsonl(path, mode):
+    """Открывает файл JSON Lines, .gz сжимается на лету, '-' — stdio."""
+    if path == '-':
+        return sys.stdout if 'w' in mode else sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, f'{mode}t', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
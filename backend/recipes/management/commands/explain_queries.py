@@ -0,0 +1,114 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.shopping_cart import get_shopping_cart
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredientAmount,
+    Tag,
+)
+from users.models import User
+
+from ._dataset import generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Show query plans and timings for hot API queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0)
+        parser.add_argument('--recipes', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep generated data instead of rolling it back',
+        )
+
+    def get_queries(self):
+        user = User.objects.filter(follower__isnull=False).first()
+        if user is None:
+            # Рецепты есть, значит есть и их авторы.
+            user = User.objects.order_by('pk').first()
+            self.stderr.write(
+                'Нет подписок: запросы пользователя выполняются '
+                f'для {user.username} без подписок'
+            )
+        author = Recipe.objects.values_list(
+            'author', flat=True
+        ).first()
+        page = list(Recipe.objects.values_list('id', flat=True)[:6])
+        slug = Tag.objects.values_list('slug', flat=True).first()
+        return {
+            'Лента рецептов': Recipe.objects.all()[:6],
+            'Фильтр по тегу': Recipe.objects.filter(
+                tags__slug__in=[slug]
+            ).distinct()[:6],
+            'Фильтр по автору': Recipe.objects.filter(author=author)[
+                :6
+            ],
+            'Фильтр is_favorited': Recipe.objects.filter(
+                favorite__user=user
+            )[:6],
+            'Ингредиенты страницы': RecipeIngredientAmount.objects.filter(
+                recipe_id__in=page
+            ).values(
+                'recipe_id', 'ingredient__name', 'amount'
+            ),
+            'Избранное страницы': Favorite.objects.filter(
+                user=user, recipe_id__in=page
+            ).values_list('recipe_id', flat=True),
+            'Список покупок': get_shopping_cart(user),
+            'Подписки': user.follower.select_related('author')[:6],
+            'Рецепты автора в подписках': Recipe.objects.filter(
+                author_id=author
+            )[:3],
+            'Добавления в избранное': Favorite.objects.filter(
+                recipe_id=page[0]
+            ).values('recipe_id'),
+            'Поиск ингредиента': Ingredient.objects.filter(
+                name__startswith='мо'
+            ),
+        }
+
+    def report(self, name, queryset, repeat):
+        analyze = connection.vendor == 'postgresql'
+        plan = (
+            queryset.explain(analyze=analyze)
+            if analyze
+            else (queryset.explain())
+        )
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(plan)
+        self.stdout.write(
+            f'мин. {min(timings):.2f} мс, '
+            f'макс. {max(timings):.2f} мс\n'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['recipes']:
+                started = time.perf_counter()
+                generate_dataset(
+                    max(options['users'], 2), options['recipes']
+                )
+                self.stdout.write(
+                    f'Данные созданы за '
+                    f'{time.perf_counter() - started:.1f} с\n'
+                )
+            if not Recipe.objects.exists():
+                self.stderr.write('Нет рецептов: укажите --recipes')
+                return
+            for name, queryset in self.get_queries().items():
+                self.report(name, queryset, options['repeat'])
+            if not options['keep']:
+                transaction.set_rollback(True)
@@ -0,0 +1,116 @@
+import json
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe, RecipeIngredientAmount
+
+from ._jsonl import open_jsonl
+
+
+class Command(BaseCommand):
+    help = (
+        'Export recipes with ingredients, tags and image references '
+        'as JSON Lines'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file, .gz or -')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def get_ingredients(self, recipe_ids):
+        ingredients = {recipe_id: [] for recipe_id in recipe_ids}
+        for recipe_id, name, measurement_unit, amount in (
+            RecipeIngredientAmount.objects.filter(
+                recipe_id__in=recipe_ids
+            )
+            .order_by('pk')
+            .values_list(
+                'recipe_id',
+                'ingredient__name',
+                'ingredient__measurement_unit',
+                'amount',
+            )
+        ):
+            ingredients[recipe_id].append(
+                {
+                    'name': name,
+                    'measurement_unit': measurement_unit,
+                    'amount': amount,
+                }
+            )
+        return ingredients
+
+    def get_tags(self, recipe_ids):
+        tags = {recipe_id: [] for recipe_id in recipe_ids}
+        for recipe_id, slug in (
+            Recipe.tags.through.objects.filter(
+                recipe_id__in=recipe_ids
+            )
+            .order_by('pk')
+            .values_list('recipe_id', 'tag__slug')
+        ):
+            tags[recipe_id].append(slug)
+        return tags
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        rows = (
+            Recipe.objects.order_by('pk')
+            .values_list(
+                'pk',
+                'author__username',
+                'name',
+                'text',
+                'image',
+                'cooking_time',
+                'pub_date',
+            )
+            .iterator(chunk_size=chunk_size)
+        )
+        started = time.perf_counter()
+        count = 0
+        output = open_jsonl(options['path'], 'w')
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                recipe_ids = [row[0] for row in chunk]
+                ingredients = self.get_ingredients(recipe_ids)
+                tags = self.get_tags(recipe_ids)
+                for (
+                    pk,
+                    author,
+                    name,
+                    text,
+                    image,
+                    cooking_time,
+                    pub_date,
+                ) in chunk:
+                    output.write(
+                        json.dumps(
+                            {
+                                'author': author,
+                                'name': name,
+                                'text': text,
+                                'image': image,
+                                'cooking_time': cooking_time,
+                                'pub_date': pub_date.isoformat(),
+                                'tags': tags[pk],
+                                'ingredients': ingredients[pk],
+                            },
+                            ensure_ascii=False,
+                        )
+                        + '\n'
+                    )
+                count += len(chunk)
+                elapsed = time.perf_counter() - started
+                self.stderr.write(
+                    f'Выгружено {count} рецептов, '
+                    f'{count / elapsed:.0f} рецептов/с'
+                )
+        finally:
+            if options['path'] != '-':
+                output.close()
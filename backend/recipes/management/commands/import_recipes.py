@@ -0,0 +1,171 @@
+import json
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from api.previews import invalidate_recipe_previews
+from api.reference_data import invalidate_reference_data
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredientAmount,
+    Tag,
+)
+
+from ._jsonl import open_jsonl
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Import recipes from JSON Lines made by export_recipes. '
+        'Authors are matched by username, tags by slug, ingredients '
+        'by name and measurement unit (missing ones are created). '
+        'Recipes that already exist for the author are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file, .gz or -')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.authors = dict(
+            User.objects.values_list('username', 'pk').iterator()
+        )
+        self.tags = dict(Tag.objects.values_list('slug', 'pk'))
+        self.ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in (
+                Ingredient.objects.values_list(
+                    'pk', 'name', 'measurement_unit'
+                ).iterator()
+            )
+        }
+        self.skipped = 0
+        started = time.perf_counter()
+        count = 0
+        source = open_jsonl(options['path'], 'r')
+        try:
+            while True:
+                lines = list(islice(source, options['batch_size']))
+                if not lines:
+                    break
+                with transaction.atomic():
+                    count += self.import_batch(
+                        [
+                            json.loads(line)
+                            for line in lines
+                            if line.strip()
+                        ]
+                    )
+                elapsed = time.perf_counter() - started
+                self.stderr.write(
+                    f'Загружено {count} рецептов, '
+                    f'пропущено {self.skipped}, '
+                    f'{count / elapsed:.0f} рецептов/с'
+                )
+        finally:
+            if options['path'] != '-':
+                source.close()
+
+    def import_batch(self, items):
+        known = [
+            item for item in items if item['author'] in self.authors
+        ]
+        self.skipped += len(items) - len(known)
+        items = known
+        existing = set(
+            Recipe.objects.filter(
+                author_id__in={
+                    self.authors[item['author']] for item in items
+                },
+                name__in={item['name'] for item in items},
+            ).values_list('author_id', 'name')
+        )
+        new_items = []
+        for item in items:
+            key = (self.authors[item['author']], item['name'])
+            if key not in existing:
+                existing.add(key)
+                new_items.append(item)
+        self.skipped += len(items) - len(new_items)
+        if not new_items:
+            return 0
+
+        self.create_missing_ingredients(new_items)
+        recipes = [
+            Recipe(
+                author_id=self.authors[item['author']],
+                name=item['name'],
+                text=item['text'],
+                image=item['image'],
+                cooking_time=item['cooking_time'],
+            )
+            for item in new_items
+        ]
+        if connection.features.can_return_ids_from_bulk_insert:
+            Recipe.objects.bulk_create(recipes)
+        else:
+            for recipe in recipes:
+                recipe.save()
+
+        # auto_now_add перезаписывает дату публикации при вставке.
+        for recipe, item in zip(recipes, new_items):
+            recipe.pub_date = parse_datetime(item['pub_date'])
+        Recipe.objects.bulk_update(recipes, ['pub_date'])
+        # bulk_create не отправляет сигналы.
+        invalidate_recipe_previews(
+            *(recipe.author_id for recipe in recipes)
+        )
+
+        RecipeIngredientAmount.objects.bulk_create(
+            RecipeIngredientAmount(
+                recipe_id=recipe.pk,
+                ingredient_id=self.ingredients[
+                    (
+                        ingredient['name'],
+                        ingredient['measurement_unit'],
+                    )
+                ],
+                amount=ingredient['amount'],
+            )
+            for recipe, item in zip(recipes, new_items)
+            for ingredient in item['ingredients']
+        )
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(
+                recipe_id=recipe.pk, tag_id=self.tags[slug]
+            )
+            for recipe, item in zip(recipes, new_items)
+            for slug in item['tags']
+            if slug in self.tags
+        )
+        return len(recipes)
+
+    def create_missing_ingredients(self, items):
+        missing = {
+            (ingredient['name'], ingredient['measurement_unit'])
+            for item in items
+            for ingredient in item['ingredients']
+        } - self.ingredients.keys()
+        if not missing:
+            return
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(
+                    name=name, measurement_unit=measurement_unit
+                )
+                for name, measurement_unit in missing
+            ),
+            ignore_conflicts=True,
+        )
+        invalidate_reference_data()
+        for pk, name, measurement_unit in Ingredient.objects.filter(
+            name__in={name for name, _ in missing}
+        ).values_list('pk', 'name', 'measurement_unit'):
+            self.ingredients[(name, measurement_unit)] = pk
@@ -2,6 +2,7 @@ import csv
 import os
 
 from django.core.management.base import BaseCommand
+from api.reference_data import invalidate_reference_data
 from backend.settings import BASE_DIR
 from recipes.models import Ingredient
 
@@ -21,3 +22,4 @@ class Command(BaseCommand):
                 measurement_unit=row[1]
             ) for row in list(table)
         )
+        invalidate_reference_data()
@@ -0,0 +1,58 @@
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.nutrition import NUTRIENTS, invalidate_all_nutrition
+from backend.settings import BASE_DIR
+from recipes.models import Ingredient, IngredientNutrition
+
+FILE = os.path.join(BASE_DIR, 'data', 'nutrition.csv')
+
+
+class Command(BaseCommand):
+    help = (
+        'Load ingredient nutrition and prices from CSV with columns: '
+        'name,measurement_unit,per_amount,' + ','.join(NUTRIENTS)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=FILE)
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['file']):
+            raise CommandError(f'Файл {options["file"]} не найден')
+        ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'pk', 'name', 'measurement_unit'
+            )
+        }
+        nutrition = {}
+        unknown = 0
+        with open(options['file'], encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                ingredient_id = ingredients.get(
+                    (row['name'], row['measurement_unit'])
+                )
+                if ingredient_id is None:
+                    unknown += 1
+                    continue
+                nutrition[ingredient_id] = IngredientNutrition(
+                    ingredient_id=ingredient_id,
+                    per_amount=int(row.get('per_amount') or 100),
+                    **{field: row[field] for field in NUTRIENTS},
+                )
+        with transaction.atomic():
+            IngredientNutrition.objects.filter(
+                ingredient_id__in=nutrition.keys()
+            ).delete()
+            IngredientNutrition.objects.bulk_create(
+                nutrition.values()
+            )
+            transaction.on_commit(invalidate_all_nutrition)
+        self.stdout.write(
+            f'Загружено: {len(nutrition)}, '
+            f'не найдено ингредиентов: {unknown}'
+        )
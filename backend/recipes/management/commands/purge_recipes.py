@@ -0,0 +1,166 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.models import (
+    ArchivedRecipe,
+    Favorite,
+    MealPlan,
+    Recipe,
+    RecipeIngredientAmount,
+    RecipeRevision,
+    ShoppingCart,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Move recipes soft-deleted long ago and their rows from the '
+        'hot tables to the archive in batches'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.RECIPE_PURGE_AFTER_DAYS,
+            help='Purge recipes deleted more than this many days ago',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='Delete without saving to the archive table',
+        )
+
+    def get_rows(self, queryset, recipe_ids, **fields):
+        rows = {recipe_id: [] for recipe_id in recipe_ids}
+        for recipe_id, *values in (
+            queryset.filter(recipe_id__in=recipe_ids)
+            .order_by('pk')
+            .values_list('recipe_id', *fields.values())
+        ):
+            rows[recipe_id].append(dict(zip(fields, values)))
+        return rows
+
+    def archive(self, recipes):
+        recipe_ids = [recipe['id'] for recipe in recipes]
+        related = {
+            'tags': self.get_rows(
+                Recipe.tags.through.objects,
+                recipe_ids,
+                id='tag_id',
+                slug='tag__slug',
+            ),
+            'ingredients': self.get_rows(
+                RecipeIngredientAmount.objects,
+                recipe_ids,
+                id='ingredient_id',
+                name='ingredient__name',
+                measurement_unit='ingredient__measurement_unit',
+                amount='amount',
+            ),
+            'favorites': self.get_rows(
+                Favorite.objects,
+                recipe_ids,
+                user='user_id',
+                created='created',
+            ),
+            'shopping_cart': self.get_rows(
+                ShoppingCart.objects,
+                recipe_ids,
+                user='user_id',
+                created='created',
+            ),
+            'meal_plans': self.get_rows(
+                MealPlan.objects,
+                recipe_ids,
+                user='user_id',
+                date='date',
+                servings='servings',
+            ),
+            'revisions': self.get_rows(
+                RecipeRevision.objects,
+                recipe_ids,
+                author='author_id',
+                created='created',
+                diff='diff',
+            ),
+        }
+        ArchivedRecipe.objects.bulk_create(
+            ArchivedRecipe(
+                original_id=recipe['id'],
+                author_id=recipe['author'],
+                name=recipe['name'],
+                deleted_at=recipe['deleted_at'],
+                data=json.dumps(
+                    dict(
+                        recipe,
+                        **{
+                            name: rows[recipe['id']]
+                            for name, rows in related.items()
+                        },
+                    ),
+                    cls=DjangoJSONEncoder,
+                    ensure_ascii=False,
+                ),
+            )
+            for recipe in recipes
+        )
+
+    def purge(self, recipe_ids):
+        # У связанных моделей нет обработчиков удаления, поэтому каскад
+        # удаляет строки каждой таблицы одним DELETE без загрузки в
+        # память.
+        Recipe.all_objects.filter(pk__in=recipe_ids).delete()
+
+    def handle(self, *args, **options):
+        deleted_before = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        action = (
+            'Удалено' if options['no_archive'] else 'Перенесено в архив'
+        )
+        started = time.perf_counter()
+        count = 0
+        while True:
+            # Каждая пачка в своей транзакции: блокировки на рабочих
+            # таблицах держатся недолго.
+            with transaction.atomic():
+                recipes = list(
+                    Recipe.all_objects.filter(
+                        deleted_at__lt=deleted_before
+                    )
+                    .order_by('deleted_at', 'pk')
+                    .select_for_update()
+                    .values(
+                        'id',
+                        'author',
+                        'name',
+                        'text',
+                        'image',
+                        'cooking_time',
+                        'pub_date',
+                        'updated_at',
+                        'deleted_at',
+                    )[:batch_size]
+                )
+                if not recipes:
+                    break
+                if not options['no_archive']:
+                    self.archive(recipes)
+                self.purge([recipe['id'] for recipe in recipes])
+            count += len(recipes)
+            self.stderr.write(
+                f'{action} {count} рецептов, '
+                f'{count / (time.perf_counter() - started):.0f} '
+                'рецептов/с'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} рецептов: {count}')
+        )
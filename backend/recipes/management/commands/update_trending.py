@@ -0,0 +1,136 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from recipes.models import (
+    Favorite,
+    Recipe,
+    ShoppingCart,
+    TrendingState,
+)
+
+WEIGHTS = ((Favorite, 1.0), (ShoppingCart, 1.0))
+# Сколько периодов полураспада учитывать при полном пересчете.
+HORIZON_HALF_LIVES = 10
+# Через сколько периодов полураспада счет приводится к новому началу
+# отсчета, пока 2 ** (возраст / период) не приблизился к пределу float.
+RESCALE_HALF_LIVES = 500
+MIN_SCORE = 1e-3
+
+
+class Command(BaseCommand):
+    help = (
+        'Update trending scores of recipes from new favorites and '
+        'shopping cart additions. Run periodically (e.g. every 10 '
+        'minutes from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recalculate scores from scratch',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        half_life = timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)
+        # Записи с created раньше until, закоммиченные позже, все равно
+        # попадают в следующий расчет, если транзакция короче задержки.
+        until = timezone.now() - timedelta(
+            seconds=settings.TRENDING_LAG_SECONDS
+        )
+        with transaction.atomic():
+            state = (
+                TrendingState.objects.select_for_update()
+                .filter(pk=1)
+                .first()
+            )
+            if state is None or options['full']:
+                Recipe.all_objects.filter(
+                    trending_score__gt=0
+                ).update(trending_score=0)
+                state = TrendingState(
+                    pk=1,
+                    epoch=until,
+                    processed_until=until
+                    - half_life * HORIZON_HALF_LIVES,
+                )
+            elif until - state.epoch > half_life * RESCALE_HALF_LIVES:
+                self.rescale(state, until, half_life)
+            until = max(until, state.processed_until)
+
+            updated = self.add_events(state, until, half_life)
+            state.processed_until = until
+            state.save()
+        self.stdout.write(
+            f'Обновлено рецептов: {updated} '
+            f'за {time.perf_counter() - started:.2f} с'
+        )
+
+    def rescale(self, state, epoch, half_life):
+        """Приводит счет всех рецептов к новому началу отсчета."""
+        factor = 0.5 ** ((epoch - state.epoch) / half_life)
+        Recipe.all_objects.filter(
+            trending_score__gte=MIN_SCORE
+        ).update(trending_score=F('trending_score') * factor)
+        Recipe.all_objects.filter(
+            trending_score__gt=0, trending_score__lt=MIN_SCORE
+        ).update(trending_score=0)
+        state.epoch = epoch
+
+    def add_events(self, state, until, half_life):
+        """Добавляет к счету вклад событий из (processed_until, until]:
+        каждое событие весит weight * 2 ** ((created - epoch) / период
+        полураспада). Счет не убывает со временем, но все рецепты
+        приведены к одному началу отсчета, поэтому их порядок тот же,
+        что и у счета, затухающего от текущего момента."""
+        recipe_ids, scores = [], []
+        for model, weight in WEIGHTS:
+            events = np.array(
+                model.objects.filter(
+                    created__gt=state.processed_until,
+                    created__lte=until,
+                ).values_list('recipe_id', 'created'),
+                dtype=object,
+            ).reshape(-1, 2)
+            if not len(events):
+                continue
+            exponents = np.array(
+                [
+                    (created - state.epoch) / half_life
+                    for created in events[:, 1]
+                ],
+                dtype=np.float64,
+            )
+            recipe_ids.append(events[:, 0].astype(np.int64))
+            scores.append(weight * 2**exponents)
+        if not recipe_ids:
+            return 0
+
+        recipe_ids, positions = np.unique(
+            np.concatenate(recipe_ids), return_inverse=True
+        )
+        increments = np.bincount(
+            positions, weights=np.concatenate(scores)
+        )
+        increments = dict(
+            zip(recipe_ids.tolist(), increments.tolist())
+        )
+        recipes = list(
+            Recipe.objects.filter(pk__in=increments.keys()).only(
+                'pk', 'trending_score'
+            )
+        )
+        for recipe in recipes:
+            recipe.trending_score += increments[recipe.pk]
+        Recipe.objects.bulk_update(
+            recipes, ['trending_score'], batch_size=1000
+        )
+        return len(recipes)
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0002_auto_20220824_2312'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.CreateModel(
+            name='RecipeRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+                ('diff', models.TextField(verbose_name='Изменения (JSON)')),
+                ('author', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор изменения')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='recipes.Recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Версия рецепта',
+                'verbose_name_plural': 'Версии рецептов',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
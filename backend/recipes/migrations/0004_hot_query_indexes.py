@@ -0,0 +1,29 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_recipe_revision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['name'], name='ingredient_name_like_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date'], name='recipe_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipeingredientamount',
+            index=models.Index(fields=['recipe', 'ingredient'], name='amount_recipe_ingredient_idx'),
+        ),
+    ]
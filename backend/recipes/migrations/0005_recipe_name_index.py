@@ -0,0 +1,21 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(
+                fields=['name'],
+                name='recipe_name_like_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:12
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientNutrition',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'per_amount',
+                    models.PositiveIntegerField(
+                        default=100,
+                        help_text='Количество в единицах измерения ингредиента, к которому относятся значения',
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                1
+                            )
+                        ],
+                        verbose_name='На количество',
+                    ),
+                ),
+                (
+                    'calories',
+                    models.FloatField(
+                        verbose_name='Калорийность, ккал'
+                    ),
+                ),
+                (
+                    'proteins',
+                    models.FloatField(verbose_name='Белки, г'),
+                ),
+                ('fats', models.FloatField(verbose_name='Жиры, г')),
+                (
+                    'carbohydrates',
+                    models.FloatField(verbose_name='Углеводы, г'),
+                ),
+                (
+                    'price',
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        verbose_name='Цена, руб.',
+                    ),
+                ),
+                (
+                    'ingredient',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='nutrition',
+                        to='recipes.Ingredient',
+                        verbose_name='Ингредиент',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Пищевая ценность',
+                'verbose_name_plural': 'Пищевая ценность',
+            },
+        ),
+    ]
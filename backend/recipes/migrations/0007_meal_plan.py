@@ -0,0 +1,74 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:15
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0006_ingredient_nutrition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealPlan',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('date', models.DateField(verbose_name='Дата')),
+                (
+                    'servings',
+                    models.PositiveSmallIntegerField(
+                        default=1,
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                1, message='Минимум 1 порция'
+                            )
+                        ],
+                        verbose_name='Порции',
+                    ),
+                ),
+                (
+                    'recipe',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='meal_plans',
+                        to='recipes.Recipe',
+                        verbose_name='Рецепт',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='meal_plans',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='Пользователь',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'План питания',
+                'verbose_name_plural': 'Планы питания',
+                'ordering': ('date', 'id'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mealplan',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'date', 'recipe'),
+                name='unique_meal_plan',
+            ),
+        ),
+    ]
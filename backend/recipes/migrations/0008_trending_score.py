@@ -0,0 +1,77 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:18
+
+import datetime
+
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+# Существующим записям ставится давняя дата, чтобы при первом расчете
+# популярности они не считались только что добавленными.
+BACKFILL_CREATED = datetime.datetime(2000, 1, 1, tzinfo=utc)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_meal_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingState',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'processed_until',
+                    models.DateTimeField(verbose_name='Учтено до'),
+                ),
+            ],
+            options={
+                'verbose_name': 'Состояние расчета популярности',
+            },
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='created',
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                default=BACKFILL_CREATED,
+                verbose_name='Дата добавления',
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='trending_score',
+            field=models.FloatField(
+                default=0, verbose_name='Популярность'
+            ),
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='created',
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                default=BACKFILL_CREATED,
+                verbose_name='Дата добавления',
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(
+                fields=['-trending_score', '-pub_date'],
+                name='recipe_trending_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0008_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRecipe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.PositiveIntegerField(unique=True, verbose_name='ID рецепта')),
+                ('name', models.CharField(max_length=200, verbose_name='Название')),
+                ('deleted_at', models.DateTimeField(verbose_name='Дата удаления')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+                ('data', models.TextField(verbose_name='Данные (JSON)')),
+            ],
+            options={
+                'verbose_name': 'Архивный рецепт',
+                'verbose_name_plural': 'Архив рецептов',
+                'ordering': ('-deleted_at',),
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_author_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_name_like_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_trending_idx',
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата удаления'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['-pub_date'], name='recipe_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['author', '-pub_date'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['name'], name='recipe_name_like_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['-trending_score', '-pub_date'], name='recipe_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(deleted_at__isnull=False), fields=['deleted_at'], name='recipe_deleted_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedrecipe',
+            name='author',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+    ]
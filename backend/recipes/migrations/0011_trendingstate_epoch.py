@@ -0,0 +1,31 @@
+# Generated by Django 2.2.19 on 2026-10-19 12:10
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def set_epoch(apps, schema_editor):
+    # Прежний счет был приведен к моменту последнего расчета.
+    TrendingState = apps.get_model('recipes', 'TrendingState')
+    TrendingState.objects.update(epoch=F('processed_until'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingstate',
+            name='epoch',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                verbose_name='Начало отсчета',
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_epoch, migrations.RunPython.noop),
+    ]
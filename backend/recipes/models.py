@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -22,11 +24,48 @@ class Ingredient(models.Model):
                 name="unique_ingredient_measurement",
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["name"],
+                name="ingredient_name_like_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}"
 
 
+class IngredientNutrition(models.Model):
+    ingredient = models.OneToOneField(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="nutrition",
+        verbose_name="Ингредиент",
+    )
+    per_amount = models.PositiveIntegerField(
+        default=100,
+        validators=[MinValueValidator(1)],
+        verbose_name="На количество",
+        help_text="Количество в единицах измерения ингредиента, "
+        "к которому относятся значения",
+    )
+    calories = models.FloatField(verbose_name="Калорийность, ккал")
+    proteins = models.FloatField(verbose_name="Белки, г")
+    fats = models.FloatField(verbose_name="Жиры, г")
+    carbohydrates = models.FloatField(verbose_name="Углеводы, г")
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, verbose_name="Цена, руб."
+    )
+
+    class Meta:
+        verbose_name = "Пищевая ценность"
+        verbose_name_plural = "Пищевая ценность"
+
+    def __str__(self):
+        return f"{self.ingredient}"
+
+
 class Tag(models.Model):
     name = models.CharField(
         max_length=200, unique=True, verbose_name="Название"
@@ -62,6 +101,17 @@ class RecipeQuerySet(models.QuerySet):
         )
 
 
+class LiveRecipeManager(models.Manager):
+    """Рецепты без мягко удаленных."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+RecipeManager = LiveRecipeManager.from_queryset(RecipeQuerySet)
+LIVE_RECIPES = models.Q(deleted_at__isnull=True)
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -83,25 +133,134 @@ class Recipe(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name="Дата публикации"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
     cooking_time = models.PositiveIntegerField(
         'Время приготовления блюда',
     )
-    objects = models.Manager()
-    marked = RecipeQuerySet.as_manager()
+    trending_score = models.FloatField(
+        default=0, verbose_name="Популярность"
+    )
+    deleted_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Дата удаления"
+    )
+    objects = RecipeManager()
+    marked = RecipeManager()
+    all_objects = RecipeQuerySet.as_manager()
 
     @property
     def added_to_favorites(self):
         return Favorite.objects.filter(recipe=self.id).count()
 
+    def soft_delete(self):
+        """Скрывает рецепт сразу, а связанные строки удаляет позже
+        команда purge_recipes."""
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["deleted_at"])
+
     class Meta:
         ordering = ("-pub_date",)
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        # Менеджер по умолчанию скрывает мягко удаленные рецепты: его
+        # используют обратные связи (author.recipes) и dumpdata, поэтому
+        # выгрузка со всеми рецептами делается с dumpdata --all.
+        # Базовый менеджер видит все рецепты, чтобы избранное, планы и
+        # ревизии удаленного рецепта до purge_recipes ссылались на него.
+        default_manager_name = "objects"
+        base_manager_name = "all_objects"
+        indexes = [
+            models.Index(
+                fields=["-pub_date"],
+                name="recipe_pub_date_idx",
+                condition=LIVE_RECIPES,
+            ),
+            models.Index(
+                fields=["author", "-pub_date"],
+                name="recipe_author_pub_date_idx",
+                condition=LIVE_RECIPES,
+            ),
+            models.Index(
+                fields=["name"],
+                name="recipe_name_like_idx",
+                opclasses=["varchar_pattern_ops"],
+                condition=LIVE_RECIPES,
+            ),
+            models.Index(
+                fields=["-trending_score", "-pub_date"],
+                name="recipe_trending_idx",
+                condition=LIVE_RECIPES,
+            ),
+            models.Index(
+                fields=["deleted_at"],
+                name="recipe_deleted_at_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}"
+
+
+class ArchivedRecipe(models.Model):
+    """Удаленный рецепт вместе со строками связанных таблиц,
+    перенесенный из рабочих таблиц командой purge_recipes."""
+
+    original_id = models.PositiveIntegerField(
+        unique=True, verbose_name="ID рецепта"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Автор",
+    )
+    name = models.CharField(max_length=200, verbose_name="Название")
+    deleted_at = models.DateTimeField(verbose_name="Дата удаления")
+    archived_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата архивации"
+    )
+    data = models.TextField(verbose_name="Данные (JSON)")
+
+    class Meta:
+        ordering = ("-deleted_at",)
+        verbose_name = "Архивный рецепт"
+        verbose_name_plural = "Архив рецептов"
 
     def __str__(self):
         return f"{self.name}"
 
 
+class RecipeRevision(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="revisions",
+        verbose_name="Рецепт",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Автор изменения",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата изменения"
+    )
+    diff = models.TextField(verbose_name="Изменения (JSON)")
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "Версия рецепта"
+        verbose_name_plural = "Версии рецептов"
+
+    def __str__(self):
+        return f"{self.recipe} {self.created}"
+
+
 class RecipeIngredientAmount(models.Model):
     ingredient = models.ForeignKey(
         Ingredient,
@@ -120,6 +279,12 @@ class RecipeIngredientAmount(models.Model):
 
     class Meta:
         verbose_name = "Количество"
+        indexes = [
+            models.Index(
+                fields=["recipe", "ingredient"],
+                name="amount_recipe_ingredient_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.ingredient} {self.amount}"
@@ -164,6 +329,11 @@ class FavoriteShoppingCartBaseModel(models.Model):
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE, verbose_name="Рецепт"
     )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name="Дата добавления",
+    )
 
     class Meta:
         abstract = True
@@ -192,3 +362,51 @@ class ShoppingCart(FavoriteShoppingCartBaseModel):
                 fields=["user", "recipe"], name="unique_shoppingcart"
             ),
         ]
+
+
+class TrendingState(models.Model):
+    """Момент, до которого учтены добавления в избранное и покупки
+    при расчете популярности рецептов, и начало отсчета, к которому
+    приведен вес событий в trending_score (одна строка)."""
+
+    processed_until = models.DateTimeField(verbose_name="Учтено до")
+    epoch = models.DateTimeField(verbose_name="Начало отсчета")
+
+    class Meta:
+        verbose_name = "Состояние расчета популярности"
+
+
+class MealPlan(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="meal_plans",
+        verbose_name="Пользователь",
+    )
+    date = models.DateField(verbose_name="Дата")
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="meal_plans",
+        verbose_name="Рецепт",
+    )
+    servings = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1, message="Минимум 1 порция")],
+        verbose_name="Порции",
+    )
+
+    class Meta:
+        ordering = ("date", "id")
+        verbose_name = "План питания"
+        verbose_name_plural = "Планы питания"
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date", "recipe"],
+                name="unique_meal_plan",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.date} {self.recipe}"
@@ -1,9 +1,16 @@
 from django.contrib import admin
 
+from backend.admin_tools import (
+    LargeTableAdminMixin,
+    PrefixSearchAdminMixin,
+)
+
 from .models import User
 
 
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(
+    LargeTableAdminMixin, PrefixSearchAdminMixin, admin.ModelAdmin
+):
     list_display = (
         "id",
         "first_name",
@@ -11,7 +18,8 @@ class UserAdmin(admin.ModelAdmin):
         "username",
         "email",
     )
-    list_filter = ("username",)
+    list_filter = ("is_staff", "is_active")
+    search_fields = ("username", "email")
 
 
 admin.site.register(User, UserAdmin)